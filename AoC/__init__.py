@@ -1,23 +1,15 @@
 if __name__ == "__main__":
     import os
-    from AoC_Companion.AoC import run, import_stuff, SpecialType
-    from AoC_Companion.Day import Collection
+    import sys
 
-    import_stuff(__file__)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from AoC.__main__ import main
 
-    years = SpecialType.apply(elements=[SpecialType.latest], coll=Collection.available_years())
-    if len(os.environ.get("AOC_ALL_DAYS", "")):
-        days = []
-    else:
-        days = SpecialType.apply(elements=[SpecialType.latest], coll=Collection.available_days(years=years))
-
-    run(years=years, days=days, tasks=[], log=True)
+    main()
 
 else:
-    import os
-    from importlib import import_module
+    from .registry import install
+    from .instrument import enable_from_env
 
-    for k in os.listdir(os.path.dirname(__file__)):
-        if not os.path.isdir(os.path.join(os.path.dirname(__file__), k)) or k.startswith("_"):
-            continue
-        import_module(f".{k}", __name__)
+    install()
+    enable_from_env()
@@ -0,0 +1,20 @@
+import os
+
+from AoC_Companion.AoC import run, SpecialType
+
+from AoC import manifest
+
+
+def main():
+    years = SpecialType.apply(elements=[SpecialType.latest], coll=manifest.available_years())
+    if len(os.environ.get("AOC_ALL_DAYS", "")):
+        days = []
+    else:
+        days = SpecialType.apply(elements=[SpecialType.latest], coll=manifest.available_days(years=years))
+
+    manifest.import_days(years=years, days=days)
+    run(years=years, days=days, tasks=[], log=True)
+
+
+if __name__ == "__main__":
+    main()
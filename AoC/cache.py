@@ -0,0 +1,220 @@
+import ast
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional
+
+from AoC import manifest
+
+CACHE_DIR_ENV = "AOC_CACHE_DIR"
+CACHE_SIZE_ENV = "AOC_CACHE_SIZE"
+NO_CACHE_ENV = "AOC_NO_CACHE"
+
+_PACKAGE_ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(_PACKAGE_ROOT), ".aoc_cache")
+DEFAULT_MAX_BYTES = 1 << 30
+
+MISSING = object()
+
+
+def _module_file(name: str) -> Optional[str]:
+    parts = name.split(".")
+    if parts[0] != __package__:
+        return None
+    base = os.path.join(_PACKAGE_ROOT, *parts[1:])
+    for candidate in (os.path.join(base, "__init__.py"), f"{base}.py"):
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def _imported_modules(path: str, name: str) -> List[str]:
+    """
+    Modules of this package the file at path (module name) imports, submodules of imported packages included
+    """
+    with open(path, "r", encoding="utf-8") as f_in:
+        tree = ast.parse(f_in.read())
+    package = name if path.endswith("__init__.py") else name.rsplit(".", 1)[0]
+    ret = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            ret.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level > 0:
+                base = package.rsplit(".", node.level - 1)[0] if node.level > 1 else package
+                base = f"{base}.{node.module}" if node.module else base
+            else:
+                base = node.module or ""
+            ret.append(base)
+            ret.extend(f"{base}.{alias.name}" for alias in node.names)
+    return [m for m in ret if _module_file(m) is not None]
+
+
+@lru_cache(maxsize=None)
+def source_files(year: int, day: int) -> FrozenSet[str]:
+    """
+    Every file of this package a day depends on: the year package holding its preprocessor, the day itself and
+    everything they import from here, followed transitively
+    """
+    start = [f"{__package__}.y{year}", manifest.module_name(year, day)]
+    seen: Dict[str, str] = {}
+    while len(start) > 0:
+        name = start.pop()
+        path = _module_file(name)
+        if name in seen or path is None:
+            continue
+        seen[name] = path
+        start.extend(_imported_modules(path, name))
+    return frozenset(seen.values())
+
+
+@lru_cache(maxsize=None)
+def config_files(year: int, day: int) -> FrozenSet[str]:
+    """
+    JSON files next to the sources of a day. Days load their decorator extra_config from there at import time
+    """
+    ret = set()
+    for directory in {os.path.dirname(p) for p in source_files(year, day)}:
+        ret.update(os.path.join(directory, f) for f in os.listdir(directory) if f.endswith(".json"))
+    return frozenset(ret)
+
+
+@lru_cache(maxsize=None)
+def source_hash(year: int, day: int) -> str:
+    """
+    Hash of the sources and config files of a day. Computed once per process, a run uses the sources it imported
+    at its start anyway
+    """
+    h = hashlib.sha256()
+    for path in sorted(source_files(year, day) | config_files(year, day)):
+        h.update(os.path.relpath(path, _PACKAGE_ROOT).encode("utf-8"))
+        with open(path, "rb") as f_in:
+            h.update(f_in.read())
+    return h.hexdigest()
+
+
+def key(kind: str, year: int, day: int, raw: str, task: Optional[int] = None,
+        extra_config: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Content address of a preprocessing ("preprocess") or task ("task") result.
+    extra_config given in the decorators is part of the source and its config files, extra_config holds overrides
+    on top of it
+    """
+    h = hashlib.sha256()
+    h.update(json.dumps([kind, year, day, task, extra_config or {}], sort_keys=True, default=repr).encode("utf-8"))
+    h.update(source_hash(year, day).encode("utf-8"))
+    h.update(raw.encode("utf-8"))
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    Pickled results on disk, one file per key. Reading a result refreshes its modification time,
+    once the cache grows beyond max_bytes the least recently used files are removed.
+    The size is counted from the directory once and then kept up to date by put, files written by other processes
+    are only noticed by the next eviction
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._size: Optional[int] = None
+
+    def _path(self, k: str) -> str:
+        return os.path.join(self.directory, k[:2], f"{k}.pkl")
+
+    def get(self, k: str) -> Any:
+        path = self._path(k)
+        try:
+            with open(path, "rb") as f_in:
+                ret = pickle.load(f_in)
+            os.utime(path)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            # Missing, evicted by another process meanwhile or unreadable
+            return MISSING
+        return ret
+
+    def put(self, k: str, value: Any) -> bool:
+        try:
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError, RecursionError):
+            return False
+        path = self._path(k)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if self._size is None:
+            self._size = self.size()
+        try:
+            replaced = os.stat(path).st_size
+        except FileNotFoundError:
+            replaced = 0
+        # Write and rename so that parallel workers never read half written files
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f_out:
+                f_out.write(payload)
+            os.replace(tmp, path)
+        except BaseException as e:
+            try:
+                os.remove(tmp)
+            except FileNotFoundError:
+                pass
+            if isinstance(e, OSError):
+                return False
+            raise
+        self._size += len(payload) - replaced
+        if self._size > self.max_bytes:
+            self.evict()
+        return True
+
+    def _entries(self) -> List[os.DirEntry]:
+        ret = []
+        if not os.path.isdir(self.directory):
+            return ret
+        for sub in os.scandir(self.directory):
+            if sub.is_dir():
+                ret.extend(e for e in os.scandir(sub.path) if e.name.endswith(".pkl"))
+        return ret
+
+    def size(self) -> int:
+        return sum(e.stat().st_size for e in self._entries())
+
+    def evict(self):
+        entries = []
+        for e in self._entries():
+            try:
+                entries.append((e.stat().st_mtime, e.stat().st_size, e.path))
+            except FileNotFoundError:
+                continue
+        total = sum(x[1] for x in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._size = total
+
+    def clear(self):
+        for e in self._entries():
+            try:
+                os.remove(e.path)
+            except FileNotFoundError:
+                pass
+        self._size = 0
+
+
+def from_env() -> Optional[ResultCache]:
+    """
+    The cache configured by the environment, None if caching is turned off
+    """
+    if len(os.environ.get(NO_CACHE_ENV, "")) > 0:
+        return None
+    return ResultCache(
+        directory=os.environ.get(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR,
+        max_bytes=int(os.environ.get(CACHE_SIZE_ENV) or DEFAULT_MAX_BYTES),
+    )
@@ -0,0 +1,82 @@
+from typing import Iterable, Tuple
+
+import numpy as np
+
+
+class GridGraph:
+    """
+    Undirected 4-neighbour graph over a width x height grid, stored directly as CSR adjacency.
+    Cells are numbered x-major (x * height + y). Blocking a cell only clears its edges in the existing
+    buffers, so the structure never has to be rebuilt and memory grows with the number of cells.
+    """
+
+    def __init__(self, width: int, height: int, blocked: Iterable[Tuple[int, int]] = ()):
+        self.width, self.height = width, height
+        cells = np.arange(width * height, dtype=np.int64).reshape((width, height))
+        src = np.concatenate((cells[:-1, :].ravel(), cells[:, :-1].ravel()))
+        dst = np.concatenate((cells[1:, :].ravel(), cells[:, 1:].ravel()))
+        rows, cols = np.concatenate((src, dst)), np.concatenate((dst, src))
+        order = np.lexsort((cols, rows))
+        rows, cols = rows[order], cols[order]
+
+        self._indptr = np.zeros(self.size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=self.size), out=self._indptr[1:])
+        self._indices = cols
+        self._data = np.ones(cols.shape[0], dtype=np.int8)
+        keys = rows * self.size + cols
+        self._reverse = np.searchsorted(keys, cols * self.size + rows)
+        self._blocked = np.zeros(self.size, dtype=bool)
+        self.block(blocked)
+
+    @property
+    def size(self) -> int:
+        return self.width * self.height
+
+    def index(self, pos: Tuple[int, int]) -> int:
+        return pos[0] * self.height + pos[1]
+
+    def position(self, idx: int) -> Tuple[int, int]:
+        return int(idx) // self.height, int(idx) % self.height
+
+    def is_blocked(self, pos: Tuple[int, int]) -> bool:
+        return bool(self._blocked[self.index(pos)])
+
+    def block(self, cells: Iterable[Tuple[int, int]]) -> np.ndarray:
+        idx = np.array([self.index(c) for c in cells], dtype=np.int64)
+        if idx.shape[0] <= 0:
+            return idx
+        self._blocked[idx] = True
+        entries = self._entries(idx)
+        self._data[entries] = 0
+        self._data[self._reverse[entries]] = 0
+        return idx
+
+    def unblock(self, cells: Iterable[Tuple[int, int]]) -> np.ndarray:
+        idx = np.array([self.index(c) for c in cells], dtype=np.int64)
+        if idx.shape[0] <= 0:
+            return idx
+        self._blocked[idx] = False
+        entries = self._entries(idx)
+        alive = ~self._blocked[self._indices[entries]]
+        self._data[entries] = alive
+        self._data[self._reverse[entries]] = alive
+        return idx
+
+    def _entries(self, idx: np.ndarray) -> np.ndarray:
+        starts, lengths = self._indptr[idx], self._indptr[idx + 1] - self._indptr[idx]
+        return np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+
+    def neighbours(self, idx: int) -> np.ndarray:
+        entries = slice(self._indptr[idx], self._indptr[idx + 1])
+        return self._indices[entries][self._data[entries] != 0]
+
+    def edges(self) -> Tuple[np.ndarray, np.ndarray]:
+        rows = np.repeat(np.arange(self.size, dtype=np.int64), np.diff(self._indptr))
+        mask = (self._data != 0) & (rows < self._indices)
+        return rows[mask], self._indices[mask]
+
+    def csr(self):
+        from scipy.sparse import csr_matrix
+        ret = csr_matrix((self._data.copy(), self._indices.copy(), self._indptr.copy()), shape=(self.size, self.size))
+        ret.eliminate_zeros()
+        return ret
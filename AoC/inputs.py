@@ -0,0 +1,28 @@
+import os
+from typing import Optional
+
+INPUT_DIR_ENV = "AOC_INPUT_DIR"
+_DEFAULT_INPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "inputs")
+
+
+def input_dir(path: Optional[str] = None) -> str:
+    if path is not None:
+        return path
+    return os.environ.get(INPUT_DIR_ENV, _DEFAULT_INPUT_DIR)
+
+
+def input_path(year: int, day: int, path: Optional[str] = None) -> str:
+    """
+    Stored puzzle inputs live in <input dir>/y<year>/Day<day>.txt, the input dir defaults to inputs/ next to the
+    package and can be moved with the AOC_INPUT_DIR environment variable
+    """
+    return os.path.join(input_dir(path), f"y{year}", f"Day{day:02d}.txt")
+
+
+def has_input(year: int, day: int, path: Optional[str] = None) -> bool:
+    return os.path.isfile(input_path(year=year, day=day, path=path))
+
+
+def load_input(year: int, day: int, path: Optional[str] = None) -> str:
+    with open(input_path(year=year, day=day, path=path), "r", encoding="utf-8") as f_in:
+        return f_in.read()
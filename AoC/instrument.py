@@ -0,0 +1,140 @@
+import json
+import os
+import sys
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from AoC import registry
+
+OUTPUT_ENV = "AOC_INSTRUMENT"
+TRACEMALLOC_ENV = "AOC_INSTRUMENT_TRACEMALLOC"
+PROFILE_ENV = "AOC_INSTRUMENT_PROFILE"
+
+
+class Measurement(NamedTuple):
+    run_id: str
+    kind: str
+    name: str
+    year: int
+    day: Optional[int]
+    task: Optional[int]
+    wall_time: float
+    cpu_time: float
+    # High-water mark of the whole process, it never goes down between calls
+    process_peak_rss_kb: Optional[int]
+    # How far this call raised that high-water mark, 0 if an earlier call already needed more
+    peak_rss_growth_kb: Optional[int]
+    tracemalloc_peak: Optional[int]
+    profile: Optional[str]
+    status: str
+
+
+class _Settings(NamedTuple):
+    output: Optional[str]
+    trace_memory: bool
+    profile_dir: Optional[str]
+
+
+_SETTINGS: Optional[_Settings] = None
+_RUN_ID = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+_MEASUREMENTS: List[Measurement] = []
+_DEPTH = 0
+
+
+def _peak_rss_kb() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # linux reports kilobytes, macOS bytes
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _emit(measurement: Measurement):
+    _MEASUREMENTS.append(measurement)
+    if _SETTINGS is not None and _SETTINGS.output is not None:
+        # One json object per line, appending keeps parallel workers from overwriting each other
+        with open(_SETTINGS.output, "a", encoding="utf-8") as f_out:
+            f_out.write(json.dumps(measurement._asdict()) + "\n")
+
+
+def measurements() -> List[Measurement]:
+    return list(_MEASUREMENTS)
+
+
+def _instrumented(kind: str, kwargs: Dict[str, Any], func: Callable) -> Callable:
+    year, day, task = kwargs.get("year"), kwargs.get("day"), kwargs.get("task")
+
+    @wraps(func)
+    def _wrapper(*args, **kw):
+        global _DEPTH
+        settings = _SETTINGS
+        # Memory tracing and profiling can not be nested, only the outermost call gets them
+        outermost = _DEPTH == 0
+        profiler, profile_path = None, None
+        if outermost and settings.trace_memory:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        if outermost and settings.profile_dir is not None:
+            import cProfile
+            profiler = cProfile.Profile()
+        status = "ok"
+        rss_before = _peak_rss_kb()
+        _DEPTH += 1
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            if profiler is not None:
+                profiler.enable()
+            return func(*args, **kw)
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            _DEPTH -= 1
+            traced_peak = None
+            if outermost and settings.trace_memory:
+                import tracemalloc
+                traced_peak = tracemalloc.get_traced_memory()[1]
+            if profiler is not None:
+                os.makedirs(settings.profile_dir, exist_ok=True)
+                profile_path = os.path.join(
+                    settings.profile_dir, f"{_RUN_ID}_{year}_{day}_{task}_{func.__name__}.prof"
+                )
+                profiler.dump_stats(profile_path)
+            rss_after = _peak_rss_kb()
+            _emit(Measurement(
+                run_id=_RUN_ID, kind=kind, name=func.__name__, year=year, day=day, task=task,
+                wall_time=wall, cpu_time=cpu, process_peak_rss_kb=rss_after,
+                peak_rss_growth_kb=None if rss_after is None else rss_after - rss_before, tracemalloc_peak=traced_peak,
+                profile=profile_path, status=status,
+            ))
+
+    return _wrapper
+
+
+def enable(output: Optional[str] = None, trace_memory: bool = False, profile_dir: Optional[str] = None):
+    """
+    Wraps every Task and Preprocessor registered from now on. Days have to be imported after enabling.
+    Measurements are kept in memory and, if an output is given, appended to it as json lines
+    """
+    global _SETTINGS
+    _SETTINGS = _Settings(output=output, trace_memory=trace_memory, profile_dir=profile_dir)
+    registry.add_hook(_instrumented)
+
+
+def enable_from_env():
+    output = os.environ.get(OUTPUT_ENV, "")
+    if len(output) <= 0:
+        return
+    enable(
+        output=output,
+        trace_memory=len(os.environ.get(TRACEMALLOC_ENV, "")) > 0,
+        profile_dir=os.environ.get(PROFILE_ENV) or None,
+    )
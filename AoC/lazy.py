@@ -0,0 +1,33 @@
+from importlib import import_module
+from types import ModuleType
+from typing import Any
+
+
+class LazyModule(ModuleType):
+    """
+    Stand-in for a module that is only imported on first attribute access.
+    Use it for libraries that are only needed for rendering so that non-rendering runs never load them.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self) -> ModuleType:
+        if self.__dict__["_lazy_module"] is None:
+            self.__dict__["_lazy_module"] = import_module(self.__name__)
+        return self.__dict__["_lazy_module"]
+
+    def __getattr__(self, item: str) -> Any:
+        return getattr(self._load(), item)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    return LazyModule(name)
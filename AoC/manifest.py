@@ -0,0 +1,104 @@
+import ast
+import os
+import re
+from functools import lru_cache
+from importlib import import_module
+from types import ModuleType
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+_YEAR_PATTERN = re.compile(r"^y(\d+)$")
+_DAY_PATTERN = re.compile(r"^Day(\d+)$")
+
+
+class Registration(NamedTuple):
+    kind: str
+    name: str
+    task: Optional[int]
+
+
+@lru_cache(maxsize=1)
+def discover() -> Dict[int, Dict[int, str]]:
+    """
+    Finds every year and day by looking at the package layout only, nothing gets imported.
+    Maps year -> day -> dotted module name
+    """
+    ret: Dict[int, Dict[int, str]] = {}
+    for year_dir in sorted(os.listdir(_ROOT)):
+        year_match = _YEAR_PATTERN.match(year_dir)
+        if year_match is None or not os.path.isfile(os.path.join(_ROOT, year_dir, "__init__.py")):
+            continue
+        days = ret.setdefault(int(year_match.group(1)), {})
+        for day_dir in os.listdir(os.path.join(_ROOT, year_dir)):
+            day_match = _DAY_PATTERN.match(day_dir)
+            if day_match is None or not os.path.isfile(os.path.join(_ROOT, year_dir, day_dir, "__init__.py")):
+                continue
+            days[int(day_match.group(1))] = f"{__package__}.{year_dir}.{day_dir}"
+    return {year: dict(sorted(days.items())) for year, days in ret.items()}
+
+
+def available_years() -> List[int]:
+    return sorted(discover().keys())
+
+
+def available_days(years: Optional[Iterable[int]] = None) -> List[int]:
+    years = available_years() if years is None else years
+    return sorted(set(day for year in years for day in discover().get(year, {})))
+
+
+def module_name(year: int, day: int) -> str:
+    return discover()[year][day]
+
+
+def module_path(year: int, day: int) -> str:
+    return os.path.join(_ROOT, *module_name(year, day).split(".")[1:], "__init__.py")
+
+
+@lru_cache(maxsize=None)
+def registrations(year: int, day: int) -> Tuple[Registration, ...]:
+    """
+    Reads the Task and Preprocessor decorators of a day from its source without executing it
+    """
+    with open(module_path(year, day), "r", encoding="utf-8") as f_in:
+        tree = ast.parse(f_in.read())
+    ret = []
+    for node in tree.body:
+        if not isinstance(node, ast.FunctionDef):
+            continue
+        for decorator in node.decorator_list:
+            if not isinstance(decorator, ast.Call) or not isinstance(decorator.func, ast.Name):
+                continue
+            if decorator.func.id not in ("Task", "Preprocessor"):
+                continue
+            task = None
+            for keyword in decorator.keywords:
+                if keyword.arg == "task":
+                    task = ast.literal_eval(keyword.value)
+            ret.append(Registration(kind=decorator.func.id, name=node.name, task=task))
+    return tuple(ret)
+
+
+def tasks(year: int, day: int) -> List[int]:
+    return sorted(set(r.task for r in registrations(year, day) if r.kind == "Task"))
+
+
+def import_day(year: int, day: int) -> ModuleType:
+    return import_module(module_name(year, day))
+
+
+def import_days(years: Iterable[int], days: Iterable[int] = ()) -> List[ModuleType]:
+    """
+    Imports the selected days of the selected years. No days means every day of those years
+    """
+    days = set(days)
+    ret = []
+    for year in years:
+        import_module(f"{__package__}.y{year}")
+        for day in discover().get(year, {}):
+            if len(days) <= 0 or day in days:
+                ret.append(import_day(year, day))
+    return ret
+
+
+def import_all() -> List[ModuleType]:
+    return import_days(years=available_years())
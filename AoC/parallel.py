@@ -0,0 +1,267 @@
+import argparse
+import json
+import multiprocessing
+import os
+import traceback
+from collections import deque
+from multiprocessing import connection
+from multiprocessing.connection import Connection
+from time import perf_counter
+from typing import Any, Callable, Deque, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from AoC import cache, inputs, instrument, manifest, registry
+
+
+class UnitResult(NamedTuple):
+    year: int
+    day: int
+    task: int
+    status: str
+    result: Any
+    duration: float
+    logs: List[str]
+    error: Optional[str] = None
+    cached: bool = False
+
+
+def _preprocess_day(year: int, day: int, raw: str, result_cache: Optional[cache.ResultCache] = None) -> Any:
+    k = cache.key("preprocess", year=year, day=day, raw=raw) if result_cache is not None else None
+    if k is not None:
+        data = result_cache.get(k)
+        if data is not cache.MISSING:
+            return data
+    manifest.import_day(year, day)
+    data = registry.preprocess(year=year, day=day, data=raw)
+    if k is not None:
+        result_cache.put(k, data)
+    return data
+
+
+def _run_unit(
+        year: int, day: int, task: int, data: Any, preprocessed: bool,
+        result_cache: Optional[cache.ResultCache] = None, result_key: Optional[str] = None,
+) -> UnitResult:
+    manifest.import_day(year, day)
+    logs: List[str] = []
+    t1 = perf_counter()
+    try:
+        if not preprocessed:
+            data = registry.preprocess(year=year, day=day, data=data)
+        result = registry.run_task(year=year, day=day, task=task, data=data, log=lambda x: logs.append(str(x)))
+    except Exception:
+        return UnitResult(year, day, task, "error", None, perf_counter() - t1, logs, traceback.format_exc())
+    ret = UnitResult(year, day, task, "ok", result, perf_counter() - t1, logs)
+    if result_cache is not None and result_key is not None:
+        result_cache.put(result_key, ret)
+    return ret
+
+
+def select_units(
+        years: Iterable[int] = (), days: Iterable[int] = (), tasks: Iterable[int] = ()
+) -> Dict[Tuple[int, int], List[int]]:
+    """
+    Works only on the manifest, so selecting units does not import any day
+    """
+    years, days, tasks = list(years) or manifest.available_years(), set(days), set(tasks)
+    ret = {}
+    for year in years:
+        for day in manifest.discover().get(year, {}):
+            if len(days) > 0 and day not in days:
+                continue
+            day_tasks = [t for t in manifest.tasks(year, day) if len(tasks) <= 0 or t in tasks]
+            if len(day_tasks) > 0:
+                ret[(year, day)] = day_tasks
+    return ret
+
+
+def _child(conn: Connection, func: Callable, args: Tuple[Any, ...]):
+    try:
+        ret = ("ok", func(*args))
+    except BaseException:
+        ret = ("error", traceback.format_exc())
+    try:
+        conn.send(ret)
+    except Exception:
+        conn.send(("unpicklable", traceback.format_exc()))
+    finally:
+        conn.close()
+
+
+class _Job(NamedTuple):
+    key: Tuple[int, int, Optional[int]]
+    process: multiprocessing.Process
+    conn: Connection
+    started: float
+
+
+def _start(key: Tuple[int, int, Optional[int]], func: Callable, args: Tuple[Any, ...]) -> _Job:
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=_child, args=(sender, func, args), daemon=True)
+    process.start()
+    sender.close()
+    return _Job(key=key, process=process, conn=receiver, started=perf_counter())
+
+
+def _stop(job: _Job):
+    if job.process.is_alive():
+        job.process.terminate()
+        job.process.join(1)
+        if job.process.is_alive():
+            job.process.kill()
+    job.process.join()
+    job.conn.close()
+
+
+def _collect(job: _Job) -> Tuple[str, Any]:
+    try:
+        ret = job.conn.recv()
+    except (EOFError, OSError):
+        job.process.join()
+        ret = ("error", f"Worker exited with code {job.process.exitcode}")
+    _stop(job)
+    return ret
+
+
+def run_parallel(
+        years: Iterable[int] = (), days: Iterable[int] = (), tasks: Iterable[int] = (),
+        workers: Optional[int] = None, timeout: Optional[float] = None, input_dir: Optional[str] = None,
+        result_cache: Optional[cache.ResultCache] = None,
+) -> List[UnitResult]:
+    """
+    Runs every selected (year, day, task) in its own worker process, at most workers at a time. Each day is
+    preprocessed once in a worker and its result is shared by all tasks of that day, which start as soon as it is
+    done. If the preprocessed data cannot be sent between processes the tasks preprocess on their own.
+    A worker running longer than timeout seconds, preprocessing included, is terminated and its units are
+    reported as "timeout". Results come back ordered by year, day and task.
+    With a result_cache, tasks whose input and sources did not change are answered from it without running,
+    days where every task is answered that way are not even preprocessed
+    """
+    workers = workers or os.cpu_count() or 1
+    units = select_units(years=years, days=days, tasks=tasks)
+    results: List[UnitResult] = []
+    raw_data: Dict[Tuple[int, int], str] = {}
+    result_keys: Dict[Tuple[int, int, int], str] = {}
+    pending: Deque[Tuple[Tuple[int, int, Optional[int]], Callable, Tuple[Any, ...]]] = deque()
+    for (year, day), day_tasks in units.items():
+        if not inputs.has_input(year=year, day=day, path=input_dir):
+            results.extend(
+                UnitResult(year, day, t, "missing input", None, 0, [], inputs.input_path(year, day, input_dir))
+                for t in day_tasks
+            )
+            continue
+        raw = raw_data[(year, day)] = inputs.load_input(year=year, day=day, path=input_dir)
+        if result_cache is not None:
+            remaining = []
+            for t in day_tasks:
+                result_keys[(year, day, t)] = cache.key("task", year=year, day=day, raw=raw, task=t)
+                cached = result_cache.get(result_keys[(year, day, t)])
+                if cached is cache.MISSING:
+                    remaining.append(t)
+                else:
+                    results.append(cached._replace(cached=True))
+            units[(year, day)] = remaining
+            if len(remaining) <= 0:
+                continue
+        pending.append(((year, day, None), _preprocess_day, (year, day, raw, result_cache)))
+
+    running: List[_Job] = []
+    try:
+        while len(pending) > 0 or len(running) > 0:
+            while len(pending) > 0 and len(running) < workers:
+                running.append(_start(*pending.popleft()))
+            wait_for = None
+            if timeout is not None and timeout > 0:
+                wait_for = max(0.0, min(job.started + timeout for job in running) - perf_counter())
+            connection.wait([job.conn for job in running] + [job.process.sentinel for job in running], wait_for)
+
+            for job in list(running):
+                (year, day, task), elapsed = job.key, perf_counter() - job.started
+                if job.conn.poll() or not job.process.is_alive():
+                    status, value = _collect(job)
+                elif timeout is not None and 0 < timeout <= elapsed:
+                    _stop(job)
+                    status, value = "timeout", f"Worker did not finish within {timeout}s"
+                else:
+                    continue
+                running.remove(job)
+
+                if task is not None:
+                    if status != "ok":
+                        value = UnitResult(year, day, task, "timeout" if status == "timeout" else "error", None,
+                                           elapsed, [], value)
+                    results.append(value)
+                elif status == "timeout":
+                    results.extend(UnitResult(year, day, t, status, None, elapsed, [], f"Preprocessing: {value}")
+                                   for t in units[(year, day)])
+                else:
+                    data, preprocessed = (value, True) if status == "ok" else (raw_data[(year, day)], False)
+                    # Tasks of a preprocessed day go first, so that days finish instead of all being half done
+                    pending.extendleft(reversed([
+                        ((year, day, t), _run_unit,
+                         (year, day, t, data, preprocessed, result_cache, result_keys.get((year, day, t))))
+                        for t in units[(year, day)]
+                    ]))
+    finally:
+        for job in running:
+            _stop(job)
+    return sorted(results, key=lambda x: (x.year, x.day, x.task))
+
+
+def format_report(results: List[UnitResult], verbose: bool = False) -> str:
+    ret = []
+    for r in results:
+        status = f"{r.status} (cached)" if r.cached else r.status
+        ret.append(f"{r.year} Day {r.day:02d} Task {r.task}: {status:<13} {r.duration:9.3f}s  "
+                   f"{r.result if r.status == 'ok' else ''}")
+        if verbose:
+            ret.extend(f"    {x}" for x in r.logs)
+        if r.error is not None and r.status != "missing input":
+            ret.extend(f"    {x}" for x in r.error.strip().split("\n"))
+    ok = sum(1 for r in results if r.status == "ok")
+    ret.append(f"{ok}/{len(results)} tasks finished, {sum(r.duration for r in results):.3f}s of task time")
+    return "\n".join(ret)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Run years, days and tasks in parallel worker processes")
+    parser.add_argument("--years", type=int, nargs="*", default=[])
+    parser.add_argument("--days", type=int, nargs="*", default=[])
+    parser.add_argument("--tasks", type=int, nargs="*", default=[])
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("AOC_WORKERS", 0)) or None)
+    parser.add_argument("--timeout", type=float, default=None, help="Seconds a single task or preprocessing may take")
+    parser.add_argument("--inputs", default=None, help=f"Input directory, defaults to ${inputs.INPUT_DIR_ENV}")
+    parser.add_argument("--json", default=None, help="Also write the report as json to this file")
+    parser.add_argument("--verbose", action="store_true", help="Include the logs of every task")
+    parser.add_argument("--instrument", default=None, help="Append timing and memory measurements to this file")
+    parser.add_argument("--no-cache", action="store_true", help=f"Or set ${cache.NO_CACHE_ENV}")
+    parser.add_argument("--cache-dir", default=None, help=f"Cache directory, defaults to ${cache.CACHE_DIR_ENV}")
+    parser.add_argument("--cache-size", type=int, default=None, help="Cache size limit in bytes")
+    parser.add_argument("--clear-cache", action="store_true")
+    args = parser.parse_args(argv)
+
+    result_cache = None if args.no_cache else cache.from_env()
+    if result_cache is not None:
+        if args.cache_dir is not None:
+            result_cache.directory = args.cache_dir
+        if args.cache_size is not None:
+            result_cache.max_bytes = args.cache_size
+        if args.clear_cache:
+            result_cache.clear()
+
+    if args.instrument is not None:
+        # Workers pick the settings up from the environment when they import the days
+        os.environ[instrument.OUTPUT_ENV] = args.instrument
+        instrument.enable_from_env()
+
+    results = run_parallel(
+        years=args.years, days=args.days, tasks=args.tasks, workers=args.workers, timeout=args.timeout,
+        input_dir=args.inputs, result_cache=result_cache,
+    )
+    print(format_report(results, verbose=args.verbose))
+    if args.json is not None:
+        with open(args.json, "w", encoding="utf-8") as f_out:
+            json.dump([r._asdict() for r in results], f_out, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+from array import array
+from collections import deque
+from heapq import heappush, heappop
+from itertools import count
+from math import inf
+from numbers import Integral
+from typing import Callable, Hashable, Iterable, Iterator, List, Optional, Tuple, Union
+
+NEIGHBOURS = Callable[[int], Iterable[Tuple[int, int]]]
+UNWEIGHTED_NEIGHBOURS = Callable[[int], Iterable[int]]
+
+
+class SearchResult:
+    """
+    Outcome of a search over flat integer node ids. Distances and predecessors live in flat buffers indexed by
+    node id, paths are only rebuilt from the predecessors when asked for.
+    """
+
+    def __init__(self, distance: List[Union[int, float]], predecessor: array, target: Optional[int] = None):
+        self.distance = distance
+        self.predecessor = predecessor
+        self.target = target
+
+    def __getitem__(self, node: int) -> Union[int, float]:
+        return self.distance[node]
+
+    def reached(self, node: int) -> bool:
+        return self.distance[node] < inf
+
+    def path(self, node: Optional[int] = None) -> List[int]:
+        node = self.target if node is None else node
+        if node is None or not self.reached(node):
+            return []
+        ret = [node]
+        while self.predecessor[node] >= 0:
+            node = self.predecessor[node]
+            ret.append(node)
+        ret.reverse()
+        return ret
+
+
+def _as_sources(sources: Union[int, Iterable[int]]) -> List[int]:
+    return [int(sources)] if isinstance(sources, Integral) else [int(x) for x in sources]
+
+
+def _buffers(size: int) -> Tuple[List[Union[int, float]], array]:
+    return [inf] * size, array("q", [-1]) * size
+
+
+def dijkstra(
+        sources: Union[int, Iterable[int]], neighbours: NEIGHBOURS, size: int,
+        targets: Optional[Iterable[int]] = None,
+) -> SearchResult:
+    """
+    Heap based dijkstra from one or many sources. neighbours yields (node, cost) pairs with non-negative costs.
+    If targets are given the search stops as soon as the first of them is settled.
+    """
+    return a_star(sources=sources, neighbours=neighbours, size=size, targets=targets, heuristic=None)
+
+
+def a_star(
+        sources: Union[int, Iterable[int]], neighbours: NEIGHBOURS, size: int,
+        targets: Optional[Iterable[int]] = None, heuristic: Optional[Callable[[int], Union[int, float]]] = None,
+) -> SearchResult:
+    """
+    A* search, heuristic has to be admissible and consistent. Without a heuristic this is plain dijkstra.
+    """
+    distance, predecessor = _buffers(size)
+    targets = None if targets is None else set(targets)
+    settled = bytearray(size)
+    heap = []
+    for s in _as_sources(sources):
+        distance[s] = 0
+        heappush(heap, (0 if heuristic is None else heuristic(s), s))
+    while heap:
+        _, node = heappop(heap)
+        if settled[node]:
+            continue
+        settled[node] = 1
+        if targets is not None and node in targets:
+            return SearchResult(distance=distance, predecessor=predecessor, target=node)
+        node_distance = distance[node]
+        for nxt, cost in neighbours(node):
+            new_distance = node_distance + cost
+            if new_distance < distance[nxt]:
+                distance[nxt] = new_distance
+                predecessor[nxt] = node
+                heappush(heap, (new_distance if heuristic is None else new_distance + heuristic(nxt), nxt))
+    return SearchResult(distance=distance, predecessor=predecessor)
+
+
+def dijkstra_banded(
+        sources: Iterable[Hashable], neighbours: Callable[[Hashable], Iterable[Tuple[Hashable, int]]],
+        targets: Iterable[Hashable], max_cost: int,
+) -> Optional[Tuple[Hashable, int]]:
+    """
+    Dijkstra for huge implicit graphs without flat buffers, nodes can be anything hashable. Every edge has to
+    exist in both directions (with possibly different costs) and cost at most max_cost. A node settled more than
+    max_cost below the distance being settled now can not neighbour anything settled from here on, so it is
+    forgotten, which keeps memory proportional to the band around the wave front. Returns the first target
+    settled with its distance, or None
+    """
+    targets = set(targets)
+    tentative = {}
+    settled = {}
+    settled_order = deque()
+    # The counter breaks ties so nodes themselves are never compared
+    tie = count()
+    heap = []
+    for s in sources:
+        tentative[s] = 0
+        heappush(heap, (0, next(tie), s))
+    while heap:
+        node_distance, _, node = heappop(heap)
+        if node in settled or tentative.get(node) != node_distance:
+            continue
+        del tentative[node]
+        if node in targets:
+            return node, node_distance
+        settled[node] = node_distance
+        settled_order.append(node)
+        while settled[settled_order[0]] < node_distance - max_cost:
+            del settled[settled_order.popleft()]
+        for nxt, cost in neighbours(node):
+            if nxt in settled:
+                continue
+            new_distance = node_distance + cost
+            if new_distance < tentative.get(nxt, inf):
+                tentative[nxt] = new_distance
+                heappush(heap, (new_distance, next(tie), nxt))
+    return None
+
+
+def bfs_01(
+        sources: Union[int, Iterable[int]], neighbours: NEIGHBOURS, size: int,
+        targets: Optional[Iterable[int]] = None,
+) -> SearchResult:
+    """
+    Shortest paths on graphs where every edge costs 0 or 1 using a deque instead of a heap.
+    """
+    distance, predecessor = _buffers(size)
+    targets = None if targets is None else set(targets)
+    settled = bytearray(size)
+    queue = deque()
+    for s in _as_sources(sources):
+        distance[s] = 0
+        queue.append(s)
+    while queue:
+        node = queue.popleft()
+        if settled[node]:
+            continue
+        settled[node] = 1
+        if targets is not None and node in targets:
+            return SearchResult(distance=distance, predecessor=predecessor, target=node)
+        node_distance = distance[node]
+        for nxt, cost in neighbours(node):
+            new_distance = node_distance + cost
+            if new_distance < distance[nxt]:
+                distance[nxt] = new_distance
+                predecessor[nxt] = node
+                if cost == 0:
+                    queue.appendleft(nxt)
+                else:
+                    queue.append(nxt)
+    return SearchResult(distance=distance, predecessor=predecessor)
+
+
+def bfs(
+        sources: Union[int, Iterable[int]], neighbours: UNWEIGHTED_NEIGHBOURS, size: int,
+        targets: Optional[Iterable[int]] = None,
+) -> SearchResult:
+    """
+    Multi-source breadth first search on unweighted graphs, neighbours only yields node ids.
+    """
+    distance, predecessor = _buffers(size)
+    targets = None if targets is None else set(targets)
+    queue = deque()
+    for s in _as_sources(sources):
+        distance[s] = 0
+        queue.append(s)
+    while queue:
+        node = queue.popleft()
+        if targets is not None and node in targets:
+            return SearchResult(distance=distance, predecessor=predecessor, target=node)
+        new_distance = distance[node] + 1
+        for nxt in neighbours(node):
+            if distance[nxt] == inf:
+                distance[nxt] = new_distance
+                predecessor[nxt] = node
+                queue.append(nxt)
+    return SearchResult(distance=distance, predecessor=predecessor)
+
+
+def grid_neighbours(shape: Tuple[int, int]) -> Callable[[int], Iterator[int]]:
+    """
+    4-neighbourhood of a row-major flattened grid with the given (height, width) shape
+    """
+    height, width = shape
+
+    def _neighbours(idx: int) -> Iterator[int]:
+        i, j = divmod(idx, width)
+        if i > 0:
+            yield idx - width
+        if i < height - 1:
+            yield idx + width
+        if j > 0:
+            yield idx - 1
+        if j < width - 1:
+            yield idx + 1
+
+    return _neighbours
@@ -0,0 +1,129 @@
+from functools import wraps
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+
+class TaskEntry(NamedTuple):
+    year: int
+    day: int
+    task: int
+    func: Callable
+    extra_config: Dict[str, Any]
+
+
+class PreprocessorEntry(NamedTuple):
+    year: int
+    day: Optional[int]
+    task: Optional[int]
+    func: Callable
+
+
+_TASKS: Dict[Tuple[int, int, int], TaskEntry] = {}
+_PREPROCESSORS: List[PreprocessorEntry] = []
+_HOOKS: List[Callable[[str, Dict[str, Any], Callable], Callable]] = []
+
+
+def add_hook(hook: Callable[[str, Dict[str, Any], Callable], Callable]):
+    """
+    A hook gets the kind ("Task" or "Preprocessor"), the decorator arguments and the function of every
+    registration made after adding it. Whatever it returns is registered instead, here and in the companion library
+    """
+    if hook not in _HOOKS:
+        _HOOKS.append(hook)
+
+
+def _apply_hooks(kind: str, kwargs: Dict[str, Any], func: Callable) -> Callable:
+    for hook in _HOOKS:
+        func = hook(kind, kwargs, func)
+    return func
+
+
+def _record_task(kwargs: Dict[str, Any], func: Callable) -> Callable:
+    func = _apply_hooks("Task", kwargs, func)
+    key = kwargs["year"], kwargs["day"], kwargs["task"]
+    _TASKS[key] = TaskEntry(*key, func=func, extra_config=dict(kwargs.get("extra_config") or {}))
+    return func
+
+
+def _record_preprocessor(kwargs: Dict[str, Any], func: Callable) -> Callable:
+    func = _apply_hooks("Preprocessor", kwargs, func)
+    _PREPROCESSORS.append(
+        PreprocessorEntry(year=kwargs["year"], day=kwargs.get("day"), task=kwargs.get("task"), func=func)
+    )
+    return func
+
+
+def _recording(decorator, record: Callable[[Dict[str, Any], Callable], Callable]):
+    if isinstance(decorator, type):
+        class _Recording(decorator):
+            def __init__(self, **kwargs):
+                super().__init__(**kwargs)
+                self._aoc_registry_kwargs = kwargs
+
+            def __call__(self, func):
+                return super().__call__(record(self._aoc_registry_kwargs, func))
+
+        _Recording.__name__ = decorator.__name__
+        _Recording.__qualname__ = decorator.__qualname__
+        _Recording.__module__ = decorator.__module__
+        _Recording._aoc_registry_original = decorator
+        return _Recording
+
+    @wraps(decorator)
+    def _decorator(**kwargs):
+        inner = decorator(**kwargs)
+
+        def _register(func):
+            return inner(record(kwargs, func))
+
+        return _register
+
+    _decorator._aoc_registry_original = decorator
+    return _decorator
+
+
+def install():
+    """
+    Makes Task and Preprocessor of the companion library record every registration here as well.
+    Has to run before any day is imported, the AoC package does that on import
+    """
+    from AoC_Companion import Day, Preprocess
+    if not hasattr(Day.Task, "_aoc_registry_original"):
+        Day.Task = _recording(Day.Task, _record_task)
+    if not hasattr(Preprocess.Preprocessor, "_aoc_registry_original"):
+        Preprocess.Preprocessor = _recording(Preprocess.Preprocessor, _record_preprocessor)
+
+
+def tasks(year: int, day: int) -> Dict[int, TaskEntry]:
+    return {k[2]: v for k, v in sorted(_TASKS.items()) if k[:2] == (year, day)}
+
+
+def get_task(year: int, day: int, task: int) -> TaskEntry:
+    return _TASKS[(year, day, task)]
+
+
+def all_tasks() -> List[TaskEntry]:
+    return [v for _, v in sorted(_TASKS.items())]
+
+
+def preprocessors(year: int, day: int, task: Optional[int] = None) -> List[PreprocessorEntry]:
+    """
+    Preprocessors in the order they are applied. Without a task the year and day wide ones,
+    with a task only the ones specific to that task
+    """
+    if task is None:
+        return [p for p in _PREPROCESSORS if p.year == year and p.day is None] + \
+            [p for p in _PREPROCESSORS if p.year == year and p.day == day and p.task is None]
+    return [p for p in _PREPROCESSORS if p.year == year and p.day == day and p.task == task]
+
+
+def preprocess(year: int, day: int, data: Any, task: Optional[int] = None) -> Any:
+    for p in preprocessors(year=year, day=day, task=task):
+        data = p.func(data)
+    return data
+
+
+def run_task(year: int, day: int, task: int, data: Any, log: Callable[[str], None], **extra_config) -> Any:
+    entry = get_task(year=year, day=day, task=task)
+    config = dict(entry.extra_config)
+    config.update(extra_config)
+    return entry.func(preprocess(year=year, day=day, data=data, task=task), log=log, **config)
@@ -0,0 +1,72 @@
+from typing import Iterable
+
+import numpy as np
+
+
+class DisjointSet:
+    """
+    Union-find over the integers 0..size-1 using union by size and path halving.
+    Parents are kept in a plain list since single element access is much cheaper than on numpy arrays.
+    """
+
+    def __init__(self, size: int):
+        self._parent = list(range(size))
+        self._size = [1] * size
+
+    def __len__(self) -> int:
+        return len(self._parent)
+
+    def find(self, x: int) -> int:
+        parent = self._parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, x: int, y: int) -> int:
+        x, y = self.find(x), self.find(y)
+        if x == y:
+            return x
+        if self._size[x] < self._size[y]:
+            x, y = y, x
+        self._parent[y] = x
+        self._size[x] += self._size[y]
+        return x
+
+    def union_all(self, xs: Iterable[int], ys: Iterable[int]):
+        for x, y in zip(xs, ys):
+            self.union(x, y)
+
+    def union_arrays(self, xs: np.ndarray, ys: np.ndarray):
+        """
+        union_all for large batches. Roots are hooked onto the smallest root they share an edge with, all at once,
+        until every pair is connected. Leaves every element pointing directly at its root
+        """
+        parent = self.roots()
+        xs, ys = np.asarray(xs, dtype=np.int64), np.asarray(ys, dtype=np.int64)
+        while xs.shape[0] > 0:
+            root_x, root_y = parent[xs], parent[ys]
+            apart = root_x != root_y
+            xs, ys, root_x, root_y = xs[apart], ys[apart], root_x[apart], root_y[apart]
+            np.minimum.at(parent, np.maximum(root_x, root_y), np.minimum(root_x, root_y))
+            parent = self._compress(parent)
+        self._parent = parent.tolist()
+        self._size = np.bincount(parent, minlength=parent.shape[0]).tolist()
+
+    def connected(self, x: int, y: int) -> bool:
+        return self.find(x) == self.find(y)
+
+    def component_size(self, x: int) -> int:
+        return self._size[self.find(x)]
+
+    @staticmethod
+    def _compress(parent: np.ndarray) -> np.ndarray:
+        # Pointer jumping, every round halves the remaining path lengths
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                return parent
+            parent = jumped
+
+    def roots(self) -> np.ndarray:
+        return self._compress(np.array(self._parent, dtype=np.int64))
@@ -1,4 +1,4 @@
-from typing import Callable, AnyStr, List, Any, Optional, Dict, Tuple, Iterable
+from typing import Callable, AnyStr, List, Any, Optional, Tuple
 
 import numpy as np
 
@@ -33,36 +33,45 @@ def run_t2(data: Any, log) -> Any:
 def _run(data: np.ndarray, log) -> Any:
     data: np.ndarray
     log(f"There are matching {data.shape[0]} lines")
-
-    collision_map: Dict[Tuple[int, int], int] = {}
-    dangerous_points = 0
-    for i in range(data.shape[0]):
-        for pt in point_line(p1=data[i, :2], p2=data[i, 2:]):
-            if pt not in collision_map:
-                collision_map[pt] = 0
-            collision_map[pt] += 1
-            if collision_map[pt] == 2:
-                dangerous_points += 1
+    overlaps = overlap_map(lines=data)
+    dangerous_points = int(np.count_nonzero(overlaps >= 2))
     log(f"There are {dangerous_points} dangerous points")
     return dangerous_points
 
 
-def point_line(p1: np.ndarray, p2: np.ndarray) -> Iterable[Tuple[int, int]]:
-    def _is_int(_x: float) -> bool:
-        return int(_x) == _x
+def line_points(lines: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    x and y of every integer point on the (n, 4) lines x1, y1, x2, y2, endpoints included
+    """
+    delta = lines[:, 2:] - lines[:, :2]
+    steps = np.gcd(delta[:, 0], delta[:, 1])
+    step = delta // np.maximum(steps, 1)[:, None]
+    lengths = steps + 1
+    line_id = np.repeat(np.arange(lines.shape[0]), lengths)
+    k = np.arange(line_id.shape[0]) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return lines[line_id, 0] + k * step[line_id, 0], lines[line_id, 1] + k * step[line_id, 1]
 
-    if p1[0] != p2[0]:
-        m = (p2[1] - p1[1]) / (p2[0] - p1[0])
-    else:
-        m = None
 
-    if m is None:
-        inc = -1 if p1[1] > p2[1] else 1
-        for i in range(p1[1], p2[1] + inc, inc):
-            yield p1[0], i
-    else:
-        inc = -1 if p1[0] > p2[0] else 1
-        for i in range(p1[0], p2[0] + inc, inc):
-            y = m * (i - p1[0]) + p1[1]
-            if _is_int(y):
-                yield i, int(y)
+def overlap_map(lines: np.ndarray, chunk_size: int = 1 << 22) -> np.ndarray:
+    """
+    How many lines cover each point, capped at 2, as a grid from the smallest to the biggest coordinates.
+    Lines are rasterised in chunks of about chunk_size (at least the grid size) points to bound the memory
+    """
+    lines = np.asarray(lines, dtype=np.int64).reshape(-1, 4)
+    if lines.shape[0] <= 0:
+        return np.zeros((0, 0), dtype=np.uint8)
+    x_min, y_min = lines[:, [0, 2]].min(), lines[:, [1, 3]].min()
+    width, height = lines[:, [0, 2]].max() - x_min + 1, lines[:, [1, 3]].max() - y_min + 1
+    lengths = np.gcd(lines[:, 2] - lines[:, 0], lines[:, 3] - lines[:, 1]) + 1
+    # Merging a chunk costs a pass over the grid, chunks smaller than the grid would make that dominate
+    chunk_size = max(chunk_size, width * height)
+    bounds = np.searchsorted(np.cumsum(lengths), np.arange(chunk_size, lengths.sum(), chunk_size), side="right")
+    ret = np.zeros(width * height, dtype=np.uint8)
+    for chunk in np.split(lines, bounds):
+        if chunk.shape[0] <= 0:
+            continue
+        xs, ys = line_points(chunk)
+        counts = np.bincount((xs - x_min) * height + (ys - y_min), minlength=ret.shape[0])
+        ret += np.minimum(counts, 2, out=counts).astype(np.uint8)
+        np.minimum(ret, 2, out=ret)
+    return ret.reshape(width, height)
@@ -1,6 +1,7 @@
-from typing import Callable, AnyStr, List, Any, Optional, Dict, Tuple, Iterable
+from typing import Callable, AnyStr, List, Any, Optional, Dict, Tuple, Iterable, Iterator
 import os
 import json
+import math
 
 import numpy as np
 
@@ -20,22 +21,28 @@ def pre_process_input(data: Any) -> Any:
 
 
 @Task(year=2021, day=6, task=1, extra_config=_config)
-def run_1(data, log, days: Dict[str, int], graphs: bool):
-    return run(task=1, data=data, log=log, days=days, graphs=graphs)
+def run_1(data, log, days: Dict[str, int], graphs: bool, history: bool = False, modulus: Optional[int] = None):
+    return run(task=1, data=data, log=log, days=days, graphs=graphs, history=history, modulus=modulus)
 
 
 @Task(year=2021, day=6, task=2, extra_config=_config)
-def run_2(data, log, days: Dict[str, int], graphs: bool):
-    return run(task=2, data=data, log=log, days=days, graphs=graphs)
+def run_2(data, log, days: Dict[str, int], graphs: bool, history: bool = False, modulus: Optional[int] = None):
+    return run(task=2, data=data, log=log, days=days, graphs=graphs, history=history, modulus=modulus)
 
 
-def run(task: int, data: Any, log: Callable[[AnyStr], None], days: Dict[str, int], graphs: bool) -> Any:
+def run(task: int, data: Any, log: Callable[[AnyStr], None], days: Dict[str, int], graphs: bool,
+        history: bool = False, modulus: Optional[int] = None) -> Any:
     days = days.get(str(task), 1)
     log(f"Simulation will run for {days} days")
     log(f"Starting population: {sum(data)}")
-    simulated_pops = _sim(init_ages=data, days=days, ret_all=graphs)
-    final_population = np.sum(simulated_pops[-1])
+    if modulus is not None:
+        log(f"Counting the population modulo {modulus}")
+    final_population = population(init_ages=data, days=days, modulus=modulus)
     log(f"Final population: {final_population}")
+    if history:
+        target_path = os.path.join(os.path.dirname(__file__), f"history_{task}.csv")
+        write_history(init_ages=data, days=days, path=target_path)
+        log(f"Saved history to {target_path}")
     if graphs:
         import matplotlib.pyplot as plt
         fig, ax = plt.subplots(1, 1)
@@ -43,25 +50,92 @@ def run(task: int, data: Any, log: Callable[[AnyStr], None], days: Dict[str, int
         ax: plt.Axes
         fig.suptitle("Simulated Population")
         ax.set_title(f"{task} for {days} days")
-        ax.plot(simulated_pops.sum(axis=1))
+        # The counts outgrow floats after a few hundred days, their logarithm does not
+        ax.plot([math.log10(max(x, 1)) for chunk in _history(init_ages=data, days=days) for x in chunk.sum(axis=1)])
+        ax.set_ylabel("log10(population)")
         target_path = os.path.join(os.path.dirname(__file__), f"pop_{task}.png")
         fig.savefig(target_path)
         log(f"Saved plot to {target_path}")
     return final_population
 
 
-def _sim(init_ages: List[int], days: int, ret_all: bool = False) -> np.ndarray:
-    ages = np.zeros((9,), dtype=int)
+def _initial(init_ages: List[int]) -> List[int]:
+    ages = [0] * 9
     for a in init_ages:
         ages[a] += 1
-    ret: np.ndarray = np.zeros((days if ret_all else 1, ages.shape[0]), dtype=int)
-    for i in range(days):
+    return ages
+
+
+def _transition() -> np.ndarray:
+    """
+    Matrix moving the 9 age buckets one day ahead. Object dtype keeps python ints, so nothing overflows
+    """
+    ret = np.zeros((9, 9), dtype=object)
+    for i in range(8):
+        ret[i, i + 1] = 1
+    ret[6, 0] = 1
+    ret[8, 0] = 1
+    return ret
+
+
+def _apply_power(matrix: np.ndarray, exponent: int, vector: np.ndarray, modulus: Optional[int] = None) -> np.ndarray:
+    """
+    matrix ** exponent @ vector by squaring. The set bits are applied to the vector right away,
+    which is a lot cheaper than multiplying them into a result matrix
+    """
+    while exponent > 0:
+        if exponent & 1:
+            vector = matrix @ vector
+        exponent >>= 1
+        if exponent > 0:
+            matrix = matrix @ matrix
+        if modulus is not None:
+            vector, matrix = vector % modulus, matrix % modulus
+    return vector
+
+
+def simulate(init_ages: List[int], days: int, modulus: Optional[int] = None) -> List[int]:
+    """
+    Age buckets after days, in O(log days) matrix products.
+    The exact numbers grow by about 3.6 bits per day, for far horizons ask for them modulo something
+    """
+    ret = _apply_power(_transition(), days, np.array(_initial(init_ages), dtype=object), modulus=modulus)
+    return [int(x) if modulus is None else int(x) % modulus for x in ret]
+
+
+def population(init_ages: List[int], days: int, modulus: Optional[int] = None) -> int:
+    ret = sum(simulate(init_ages=init_ages, days=days, modulus=modulus))
+    return ret if modulus is None else ret % modulus
+
+
+def _history(init_ages: List[int], days: int, chunk_size: int = 4096) -> Iterator[np.ndarray]:
+    """
+    Age buckets after every day as (<= chunk_size, 9) object arrays, so only one chunk is held at a time
+    """
+    ages = _initial(init_ages)
+    chunk = []
+    for _ in range(days):
         parents = ages[0]
-        ages[:-1] = ages[1:]
+        ages = ages[1:] + [parents]
         ages[6] += parents
-        ages[8] = parents
-        ret[i if ret_all else 0] = ages
-    return ret
+        chunk.append(ages)
+        if len(chunk) >= chunk_size:
+            yield np.array(chunk, dtype=object)
+            chunk = []
+    if len(chunk) > 0:
+        yield np.array(chunk, dtype=object)
+
+
+def write_history(init_ages: List[int], days: int, path: str, chunk_size: int = 4096):
+    with open(path, "w", encoding="utf-8") as f_out:
+        f_out.write("day," + ",".join(f"age_{i}" for i in range(9)) + ",total\n")
+        day = 1
+        for chunk in _history(init_ages=init_ages, days=days, chunk_size=chunk_size):
+            lines = []
+            for ages in chunk:
+                lines.append(f"{day}," + ",".join(str(x) for x in ages) + f",{sum(ages)}\n")
+                day += 1
+            f_out.writelines(lines)
 
 
 def _sim_v2(init_ages: List[int], days: int, ret_all: bool = False) -> np.ndarray:
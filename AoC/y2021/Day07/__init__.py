@@ -22,26 +22,79 @@ def run_t1(data: np.ndarray, log) -> Any:
 
 @Task(year=2021, day=7, task=2)
 def run_t2(data: Any, log) -> Any:
-    def f(t):
-        return ((t + 1) * t) / 2
-
-    return _run(data=data, f=f, log=log)
-
-
-def _run(data: np.ndarray, log: Callable[[AnyStr], None], f: Optional[Callable[[int], int]] = None):
-    mi, ma = np.min(data), np.max(data)
-    best = np.inf
-    tar_pos = -1
-    no_kernel = f is None
-    if f is None:
-        def f(x):
-            return x
-    for i in range(mi + 1, ma, 1):
-        this = np.sum(f(np.abs(data - i)), dtype=int)
-        if this < best:
-            best = this
-            tar_pos = i
+    return _run(data=data, log=log, triangular=True)
+
+
+def _run(data: np.ndarray, log: Callable[[AnyStr], None], triangular: bool = False):
+    tar_pos, best = best_position(data=data, triangular=triangular)
     log(f"There are {data.shape[0]} craps helping. How nice")
-    log(f"Using {'no' if no_kernel else 'a'} kernel to adjust values")
+    log(f"Using {'a triangular' if triangular else 'a linear'} fuel cost")
     log(f"Craps will go to target position {tar_pos}")
     return best
+
+
+def fuel(data: np.ndarray, position: int, triangular: bool = False) -> int:
+    distance = np.abs(data - position)
+    if triangular:
+        return int(np.sum(distance * (distance + 1) // 2))
+    return int(np.sum(distance))
+
+
+def best_position(data: np.ndarray, triangular: bool = False) -> Tuple[int, int]:
+    """
+    Cheapest target position and its fuel. Linear costs are minimal at the median. Triangular costs are
+    minimal within half a step of the mean, so only the integers around it have to be checked. If there are
+    fewer positions than crabs the whole cost curve is cheaper than that
+    """
+    if not triangular:
+        median = (data.shape[0] - 1) // 2
+        position = int(np.partition(data, median)[median])
+        return position, fuel(data=data, position=position)
+    if int(np.max(data)) - int(np.min(data)) <= data.shape[0]:
+        positions, costs = cost_curve(data=data, triangular=True)
+        best = int(np.argmin(costs))
+        return int(positions[best]), int(costs[best])
+    mean = int(np.sum(data)) // data.shape[0]
+    crabs = data.astype(np.int64)
+    positions = np.arange(mean - 1, mean + 3, dtype=np.int64)
+    left = crabs[:, None] < positions[None, :]
+    costs = _fuel_from_sums(
+        positions=positions, left_n=left.sum(axis=0), left_s=crabs @ left, left_q=crabs ** 2 @ left,
+        n=crabs.shape[0], s=int(np.sum(crabs)), q=int(np.sum(crabs ** 2)), triangular=True,
+    )
+    # argmin takes the first minimum, so ties go to the smaller position
+    best = int(np.argmin(costs))
+    return int(positions[best]), int(costs[best])
+
+
+def _fuel_from_sums(positions: np.ndarray, left_n: np.ndarray, left_s: np.ndarray, left_q: np.ndarray,
+                    n: int, s: int, q: int, triangular: bool = False) -> np.ndarray:
+    """
+    Fuel for every position in O(1) each, from the count, summed positions and summed squared positions of the
+    crabs strictly left of it (left_*) and of all crabs (n, s, q)
+    """
+    right_n, right_s = n - left_n, s - left_s
+    linear = positions * left_n - left_s + right_s - positions * right_n
+    if not triangular:
+        return linear
+    squared = q - 2 * positions * s + positions ** 2 * n
+    return (squared + linear) // 2
+
+
+def cost_curve(data: np.ndarray, triangular: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fuel for every target position between the smallest and biggest crab, for plotting.
+    Built from prefix sums over the crab counts per position, so each position costs O(1)
+    """
+    low = int(np.min(data))
+    counts = np.bincount(data - low).astype(np.int64)
+    positions = np.arange(counts.shape[0], dtype=np.int64)
+    # Crabs, their summed positions and summed squared positions strictly left of every position
+    left_n = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    left_s = np.concatenate([[0], np.cumsum(counts * positions)[:-1]])
+    left_q = np.concatenate([[0], np.cumsum(counts * positions ** 2)[:-1]])
+    costs = _fuel_from_sums(
+        positions=positions, left_n=left_n, left_s=left_s, left_q=left_q, n=int(counts.sum()),
+        s=int(np.sum(counts * positions)), q=int(np.sum(counts * positions ** 2)), triangular=triangular,
+    )
+    return positions + low, costs
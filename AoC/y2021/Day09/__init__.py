@@ -1,4 +1,4 @@
-from typing import Callable, AnyStr, List, Any, Optional, Dict, Tuple, Iterable
+from typing import Callable, AnyStr, List, Any, Optional, Tuple, Iterable, Iterator
 import os
 import json
 
@@ -8,6 +8,8 @@ from AoC_Companion.Day import Task
 from AoC_Companion.test import TestData
 from AoC_Companion.Preprocess import Preprocessor
 
+from ...union_find import DisjointSet
+
 
 @Preprocessor(year=2021, day=9)
 def pre_process_input(data: Any) -> Any:
@@ -34,15 +36,8 @@ def run_t2(data: np.ndarray, log, create_image: bool = False, gif_frames: int =
     lows = _find_lows(data=data)
     log(f"The smoke field has a size of {'x'.join(str(x) for x in data.shape)}")
     log(f"There are {np.sum(lows)} low points smoke will flow to and potentially create a basin")
-    pos = list(zip(*np.where(lows)))
-    basins: Dict[Tuple[Tuple[int, int], ...], np.ndarray] = {}
-    for i, j in pos:
-        basin = _flow(data=data, seed=(i, j), wall_height=9, flown=np.zeros(shape=data.shape, dtype=bool))
-        identity = tuple(zip(*np.where(basin)))
-        if identity not in basins:
-            basins[identity] = basin
-    log(f"{len(basins)} potential basins found")
-    basin_sizes = sorted([np.sum(x) for x in basins.values()], reverse=True)
+    basin_sizes = sorted(basin_sizes_at(data=data, lows=lows, wall_height=9), reverse=True)
+    log(f"{len(basin_sizes)} potential basins found")
     n = 3
     ret = np.prod(basin_sizes[:n])
     log(f"The {n} largest basins have a size of {' * '.join(str(x) for x in basin_sizes[:n])} = {ret}")
@@ -94,18 +89,67 @@ def run_t2(data: np.ndarray, log, create_image: bool = False, gif_frames: int =
     return ret
 
 
+def _basin_roots(data: np.ndarray, max_wall_height: int = 9) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Union-find root of every cell for the wall heights 0 to max_wall_height. Neighbours are merged as soon as
+    the wall is higher than both of them, so raising the wall only merges the newly flooded cells and every
+    height comes out of a single pass
+    """
+    flat = data.ravel()
+    ids = np.arange(flat.shape[0]).reshape(data.shape)
+    first = np.concatenate([ids[:, :-1].ravel(), ids[:-1, :].ravel()])
+    second = np.concatenate([ids[:, 1:].ravel(), ids[1:, :].ravel()])
+    edge_heights = np.maximum(flat[first], flat[second])
+    order = np.argsort(edge_heights, kind="stable")
+    first, second, edge_heights = first[order], second[order], edge_heights[order]
+    basins = DisjointSet(flat.shape[0])
+    merged = 0
+    for wall_height in range(max_wall_height + 1):
+        stop = int(np.searchsorted(edge_heights, wall_height, side="left"))
+        basins.union_arrays(first[merged:stop], second[merged:stop])
+        merged = stop
+        yield wall_height, basins.roots().reshape(data.shape)
+
+
+def _basin_sizes(data: np.ndarray, roots: np.ndarray, lows: np.ndarray, wall_height: int) -> np.ndarray:
+    """
+    Size of the basin every cell belongs to, 0 for cells at or above the wall and cells not flowing to a low point
+    """
+    flooded = data < wall_height
+    sizes = np.bincount(roots[flooded], minlength=roots.size)
+    with_low = np.zeros(roots.size, dtype=bool)
+    with_low[roots[lows & flooded]] = True
+    return np.where(flooded & with_low[roots], sizes[roots], 0)
+
+
+def basin_sizes_at(data: np.ndarray, lows: np.ndarray = None, wall_height: int = 9) -> List[int]:
+    if lows is None:
+        lows = _find_lows(data=data)
+    roots = None
+    for _, roots in _basin_roots(data=data, max_wall_height=wall_height):
+        pass
+    flooded_lows = lows & (data < wall_height)
+    basin_roots = np.unique(roots[flooded_lows])
+    sizes = np.bincount(roots[data < wall_height], minlength=roots.size)
+    return [int(x) for x in sizes[basin_roots]]
+
+
 def create_img(data: np.ndarray, wall_height: int = 9, lows: np.ndarray = None) -> np.ndarray:
     if lows is None:
         lows = _find_lows(data=data)
-    pos = list(zip(*np.where(lows)))
-    basins = [
-        _flow(data=data, seed=pt, wall_height=wall_height, flown=np.zeros(shape=data.shape, dtype=bool))
-        for pt in pos
-    ]
-    img = np.zeros(shape=data.shape, dtype=int)
-    for basin in basins:
-        img[basin] = np.sum(basin)
-    return img
+    return next(img for h, img in create_imgs(data=data, max_wall_height=wall_height, lows=lows) if h == wall_height)
+
+
+def create_imgs(
+        data: np.ndarray, max_wall_height: int = 9, lows: np.ndarray = None
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    create_img for every wall height from 0 to max_wall_height in a single pass
+    """
+    if lows is None:
+        lows = _find_lows(data=data)
+    for wall_height, roots in _basin_roots(data=data, max_wall_height=max_wall_height):
+        yield wall_height, _basin_sizes(data=data, roots=roots, lows=lows, wall_height=wall_height)
 
 
 def create_gif(data: np.ndarray, target: str, max_wall_height: int = 9):
@@ -119,7 +163,7 @@ def create_gif(data: np.ndarray, target: str, max_wall_height: int = 9):
 
     lows = _find_lows(data=data)
 
-    images = np.array([create_img(data=data, lows=lows, wall_height=x) for x in range(max_wall_height + 1)])
+    images = np.array([img for _, img in create_imgs(data=data, lows=lows, max_wall_height=max_wall_height)])
     min_basin_size, max_basin_size = np.min(images), np.max(images)
     c_map = plt.get_cmap("inferno")(np.arange(min_basin_size, max_basin_size + 1, 1))
     images_colored = (c_map[images] * np.iinfo(np.uint8).max).astype(np.uint8)
@@ -187,18 +231,3 @@ def _find_lows(data: np.ndarray) -> np.ndarray:
 
 def pt_in_data(data: np.ndarray, point: Tuple[int, int]):
     return all(0 <= pt < sh for pt, sh in zip(point, data.shape))
-
-
-def _flow(data: np.ndarray, seed: Tuple[int, int], wall_height: int = 9, flown: np.ndarray = None) -> np.ndarray:
-    i, j = seed
-    if not pt_in_data(data=data, point=seed):
-        return flown
-
-    if data[i, j] < wall_height and not flown[i, j]:
-        if not flown[i, j]:
-            flown[i, j] = True
-            for i_n, j_n in [(i + _i, j + _j) for _i, _j in ((1, 0), (-1, 0), (0, 1), (0, -1))]:
-                if pt_in_data(data=data, point=(i_n, j_n)) and data[i, j] < data[i_n, j_n]:
-                    flown = _flow(data=data, seed=(i_n, j_n), wall_height=wall_height, flown=flown)
-
-    return flown
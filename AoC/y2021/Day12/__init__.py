@@ -1,4 +1,4 @@
-from typing import Callable, AnyStr, List, Any, Optional, Dict, Tuple, Iterable, Set
+from typing import Callable, AnyStr, List, Any, Optional, Dict, Tuple, Iterable, Set, Iterator
 import os
 import json
 import enum
@@ -32,9 +32,9 @@ def run_t1(data: Dict[str, Set[str]], log: Callable[[str], None]) -> Any:
     log(f"The tunnel network has {len(data)} caves")
     log(f"  {sum(1 if str(x).isupper() else 0 for x in data.keys() if x not in ('start', 'end'))} are big")
     log(f"  {sum(0 if str(x).isupper() else 1 for x in data.keys() if x not in ('start', 'end'))} are small")
-    paths = _find_way(system=data, start="start", target="end", special_rule=False)
-    log(f"There are {len(paths)} paths possible when you visit small caves only once")
-    return len(paths)
+    paths = count_ways(system=data, start="start", target="end", special_rule=False)
+    log(f"There are {paths} paths possible when you visit small caves only once")
+    return paths
 
 
 @Task(year=2021, day=12, task=2)
@@ -42,46 +42,56 @@ def run_t2(data: Dict[str, Set[str]], log: Callable[[str], Any]) -> Any:
     log(f"The tunnel network has {len(data)} caves")
     log(f"  {sum(1 if str(x).isupper() else 0 for x in data.keys() if x not in ('start', 'end'))} are big")
     log(f"  {sum(0 if str(x).isupper() else 1 for x in data.keys() if x not in ('start', 'end'))} are small")
-    paths = _find_way(system=data, start="start", target="end", special_rule=True)
-    log(f"There are {len(paths)} paths possible when you allow yourself to visit one small cave twice")
-    return len(paths)
-
-
-def _can_visit(cave: str, visited: List[str]) -> bool:
-    return cave.isupper() or cave not in visited
-
-
-def _can_visit_special(cave: str, visited: List[str]) -> Tuple[bool, bool]:
-    if _can_visit(cave=cave, visited=visited):
-        return True, False
-    lower_caves = [x for x in visited if x.islower()]
-    if len(set(lower_caves)) == len(lower_caves) and cave not in ["start", "end"]:
-        return True, True
-    return False, False
-
-
-def _find_way(system: Dict[str, Set[str]], start: str, target: str, special_rule: bool) -> Set[Tuple[str]]:
-    import queue
-    sub_paths = queue.Queue()
-    sub_paths.put(([start], not special_rule))
-    ret: Set[Tuple[str]] = set()
-
-    while not sub_paths.empty():
-        sub_path, special_taken = sub_paths.get()
-        sub_path: List[str]
-        special_taken: bool
-        for next_cave in system[sub_path[-1]]:
-            _special_taken = special_taken
-            if _special_taken and not _can_visit(cave=next_cave, visited=sub_path):
-                continue
-            elif not _special_taken:
-                can_visit, _special_taken = _can_visit_special(cave=next_cave, visited=sub_path)
-                if not can_visit:
+    paths = count_ways(system=data, start="start", target="end", special_rule=True)
+    log(f"There are {paths} paths possible when you allow yourself to visit one small cave twice")
+    return paths
+
+
+def count_ways(system: Dict[str, Set[str]], start: str, target: str, special_rule: bool) -> int:
+    """
+    Number of paths from start to target without listing them. Small caves are bits of a visited mask, the count
+    only depends on the current cave, that mask and whether the double visit is used up, so it is memoised on those
+    """
+    caves = sorted(system.keys())
+    index = {c: i for i, c in enumerate(caves)}
+    neighbours = [[index[n] for n in sorted(system[c])] for c in caves]
+    small = [c.islower() for c in caves]
+    start_id, target_id = index[start], index[target]
+    memory: Dict[Tuple[int, int, bool], int] = {}
+
+    def _count(cave: int, visited: int, twice_taken: bool) -> int:
+        if cave == target_id:
+            return 1
+        key = (cave, visited, twice_taken)
+        if key not in memory:
+            ret = 0
+            for n in neighbours[cave]:
+                bit = 1 << n
+                if not small[n] or not visited & bit:
+                    ret += _count(n, visited | bit if small[n] else visited, twice_taken)
+                elif not twice_taken and n not in (start_id, target_id):
+                    ret += _count(n, visited, True)
+            memory[key] = ret
+        return memory[key]
+
+    return _count(start_id, 1 << start_id if small[start_id] else 0, not special_rule)
+
+
+def iter_ways(system: Dict[str, Set[str]], start: str, target: str, special_rule: bool) -> Iterator[Tuple[str, ...]]:
+    """
+    Every path from start to target, depth first and one at a time. Only paths still being extended are kept
+    """
+    stack: List[Tuple[Tuple[str, ...], Set[str], bool]] = [((start,), {start}, not special_rule)]
+    while len(stack) > 0:
+        path, visited, twice_taken = stack.pop()
+        for next_cave in sorted(system[path[-1]], reverse=True):
+            _twice_taken = twice_taken
+            if next_cave.islower() and next_cave in visited:
+                if twice_taken or next_cave in (start, target):
                     continue
-            new_path = sub_path + [next_cave]
+                _twice_taken = True
+            new_path = path + (next_cave,)
             if next_cave == target:
-                ret.add(tuple(new_path))
+                yield new_path
             else:
-                sub_paths.put((new_path, _special_taken))
-
-    return ret
+                stack.append((new_path, visited | {next_cave} if next_cave.islower() else visited, _twice_taken))
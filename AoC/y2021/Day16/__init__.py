@@ -4,38 +4,37 @@ import json
 import enum
 from queue import LifoQueue
 
-import numpy as np
-
 from AoC_Companion.Day import Task
 from AoC_Companion.test import TestData
 from AoC_Companion.Preprocess import Preprocessor
 
-from .bits import BuoyancyInterchangeTransmissionPacket as Bits
+from .bits import BuoyancyInterchangeTransmissionPacket as Bits, BitReader
 
 
 @Preprocessor(year=2021, day=16)
 def pre_process_input(data: Any) -> Any:
     data = [x for x in data if len(x) > 0]
-    bin_str = "".join('{0:04b}'.format(int(x, 16)) for x in data[0])
-    ret = np.array([int(x) for x in bin_str], dtype=np.uint8)
+    ret = data[0].strip()
     return ret
 
 
 @Task(year=2021, day=16, task=1)
-def run_t1(data: np.ndarray, log: Callable[[str], None]) -> Any:
-    packet, *_ = Bits.parse(data=data.copy())
+def run_t1(data: str, log: Callable[[str], None]) -> Any:
+    reader = BitReader.from_hex(data)
+    packet, *_ = Bits.parse(data=reader)
     log(f"The data had {packet.get_packet_count()} packets and a max depth of {packet.get_depth()}")
-    log(f"Root package has a length of {len(packet)} bits. Input has a length of {data.shape[0]} bits")
+    log(f"Root package has a length of {len(packet)} bits. Input has a length of {reader.length} bits")
     ret = packet.get_version_sum()
     log(f"Sum of versions {ret}")
     return ret
 
 
 @Task(year=2021, day=16, task=2, extra_config={"create_summary": True})
-def run_t2(data: np.ndarray, log: Callable[[str], None], create_summary: bool = False) -> Any:
-    packet, *_ = Bits.parse(data=data.copy())
+def run_t2(data: str, log: Callable[[str], None], create_summary: bool = False) -> Any:
+    reader = BitReader.from_hex(data)
+    packet, *_ = Bits.parse(data=reader)
     log(f"The data had {packet.get_packet_count()} packets and a max depth of {packet.get_depth()}")
-    log(f"Root package has a length of {len(packet)} bits. Input has a length of {data.shape[0]} bits")
+    log(f"Root package has a length of {len(packet)} bits. Input has a length of {reader.length} bits")
     ret = packet.get_value()
     log(f"Value of root package {ret}")
     if create_summary:
@@ -1,9 +1,55 @@
 from abc import ABC, abstractmethod
-from typing import Optional, Type, List, Tuple, Iterable, Dict
+from typing import Optional, Type, List, Tuple, Iterable, Dict, Union
 
 import numpy as np
 
 
+class BitReader:
+    """
+    Reads big endian bit fields from a bytes buffer with a cursor. Every read only touches the bytes the field
+    spans, so reading a whole transmission is linear in its length and nothing gets copied
+    """
+
+    def __init__(self, buffer: bytes, length: Optional[int] = None, position: int = 0):
+        self._buffer = bytes(buffer)
+        self.length = len(self._buffer) * 8 if length is None else length
+        self.position = position
+
+    @classmethod
+    def from_hex(cls, text: str) -> "BitReader":
+        text = text.strip()
+        return cls(bytes.fromhex(text + "0" * (len(text) % 2)), length=len(text) * 4)
+
+    @classmethod
+    def from_bits(cls, bits: np.ndarray) -> "BitReader":
+        return cls(np.packbits(np.asarray(bits, dtype=np.uint8)).tobytes(), length=len(bits))
+
+    def read(self, n: int) -> int:
+        stop = self.position + n
+        if stop > self.length:
+            raise EOFError(f"Can not read {n} bits at {self.position}, only {self.length} bits available")
+        chunk = int.from_bytes(self._buffer[self.position >> 3:(stop + 7) >> 3], "big")
+        self.position = stop
+        return (chunk >> (-stop & 7)) & ((1 << n) - 1)
+
+    def remaining(self) -> int:
+        return self.length - self.position
+
+    def is_zero(self) -> bool:
+        """
+        Whether all bits from the cursor on are 0
+        """
+        if self.remaining() <= 0:
+            return True
+        first = self.position >> 3
+        head = self._buffer[first] & (0xFF >> (self.position & 7))
+        return head == 0 and not any(self._buffer[first + 1:(self.length + 7) >> 3])
+
+    def bits(self, start: int, length: int) -> np.ndarray:
+        data = np.frombuffer(self._buffer[start >> 3:(start + length + 7) >> 3], dtype=np.uint8)
+        return np.unpackbits(data)[start & 7:(start & 7) + length]
+
+
 class BuoyancyInterchangeTransmissionPacket(ABC):
     _identification: Dict[int, Type["BuoyancyInterchangeTransmissionPacket"]] = {}
 
@@ -13,17 +59,22 @@ class BuoyancyInterchangeTransmissionPacket(ABC):
             raise KeyError(f"packet for {typ} already registered")
         cls._identification[typ] = packet
 
-    def __init__(self, version: int, typ: int, data: np.ndarray):
-        self._data = data
+    def __init__(self, version: int, typ: int, reader: BitReader, start: int):
+        self._reader = reader
+        self._start = start
+        self._length = 0
         self._version = version
         self._typ = typ
 
     def get_data(self) -> np.ndarray:
-        return self._data.copy()
+        return self._reader.bits(start=self._start, length=self._length)
 
     @staticmethod
     def bin_to_int(data: Iterable[int]) -> int:
-        return int("".join(str(x) for x in data), 2)
+        ret = 0
+        for x in data:
+            ret = (ret << 1) | int(x)
+        return ret
 
     def get_version(self) -> int:
         return self._version
@@ -35,7 +86,19 @@ class BuoyancyInterchangeTransmissionPacket(ABC):
         return self._typ
 
     def __len__(self) -> int:
-        return self._data.shape[0]
+        return self._length
+
+    def is_complete(self, position: int) -> bool:
+        return True
+
+    def finish(self, position: int):
+        """
+        Called once all sub packets are read and the reader stands at the end of this packet
+        """
+        self._length = position - self._start
+
+    def add_sub_packet(self, packet: "BuoyancyInterchangeTransmissionPacket"):
+        raise TypeError(f"{self.__class__.__name__} can not contain other packets")
 
     @abstractmethod
     def get_value(self) -> int:
@@ -54,14 +117,35 @@ class BuoyancyInterchangeTransmissionPacket(ABC):
         pass
 
     @classmethod
-    def parse(cls, data: np.ndarray) -> Tuple[Optional["BuoyancyInterchangeTransmissionPacket"], int]:
-        if (data == 0).all():
+    def parse(
+            cls, data: Union[BitReader, bytes, np.ndarray]
+    ) -> Tuple[Optional["BuoyancyInterchangeTransmissionPacket"], int]:
+        """
+        Reads the packet at the start of data, which is a reader (read from its cursor on), raw bytes or single bits.
+        The tree is built without recursion, open operator packets wait on a stack for their sub packets
+        """
+        if isinstance(data, BitReader):
+            reader = data
+        elif isinstance(data, (bytes, bytearray)):
+            reader = BitReader(data)
+        else:
+            reader = BitReader.from_bits(data)
+        if reader.is_zero():
             return None, -1
-        version = cls.bin_to_int(data=data[:3])
-        typ = cls.bin_to_int(data=data[3:6])
-        packet_class = cls.identify(typ=typ)
-        packet = packet_class(version, typ, data)
-        return packet, len(packet)
+
+        open_packets: List[BuoyancyInterchangeTransmissionPacket] = []
+        while True:
+            start = reader.position
+            version = reader.read(3)
+            typ = reader.read(3)
+            packet = cls.identify(typ=typ)(version, typ, reader, start)
+            while packet.is_complete(reader.position):
+                packet.finish(reader.position)
+                if len(open_packets) <= 0:
+                    return packet, len(packet)
+                open_packets[-1].add_sub_packet(packet)
+                packet = open_packets.pop()
+            open_packets.append(packet)
 
     @classmethod
     def identify(cls, typ: int) -> Type["BuoyancyInterchangeTransmissionPacket"]:
@@ -79,16 +163,14 @@ register = BuoyancyInterchangeTransmissionPacket.register
 
 class LiteralPackage(BuoyancyInterchangeTransmissionPacket):
 
-    def __init__(self, version: int, typ: int, data: np.ndarray):
-        i = 6
-        value: List[int] = []
+    def __init__(self, version: int, typ: int, reader: BitReader, start: int):
+        super().__init__(version, typ, reader, start)
+        self._value = 0
         while True:
-            value.extend(data[i + 1:i + 5])
-            i += 5
-            if data[i - 5] == 0:
+            group = reader.read(5)
+            self._value = (self._value << 4) | (group & 0xF)
+            if group & 0x10 == 0:
                 break
-        self._value = self.bin_to_int(data=value)
-        super().__init__(version, typ, data[:i])
 
     def get_value(self) -> int:
         return self._value
@@ -105,57 +187,55 @@ class LiteralPackage(BuoyancyInterchangeTransmissionPacket):
 
 class OperatorPackage(BuoyancyInterchangeTransmissionPacket):
 
-    def __init__(self, version: int, typ: int, data: np.ndarray):
+    def __init__(self, version: int, typ: int, reader: BitReader, start: int):
         from .operators import get_operator
+        super().__init__(version, typ, reader, start)
         self._sub_packets: List[BuoyancyInterchangeTransmissionPacket] = []
-
         self._my_op = get_operator(typ=typ)()
+        self._end: Optional[int] = None
+        self._sub_packet_count: Optional[int] = None
 
-        length_type: int = data[6]
+        length_type = reader.read(1)
         if length_type == 0:
-            offset = 7 + 15
-            sub_packets_len = self.bin_to_int(data[7:offset])
-            length = offset + sub_packets_len
-            n = np.inf
-            sub_packets_data = data[offset:length]
-        elif length_type == 1:
-            offset = 7 + 11
-            length = None
-            n = self.bin_to_int(data[7:offset])
-            sub_packets_data = data[offset:]
+            sub_packets_len = reader.read(15)
+            self._end = reader.position + sub_packets_len
         else:
-            raise ValueError(f"Cant handle {length_type=}")
-
-        j = 0
-        while True:
-            if j >= n:
-                break
-            j += 1
-            sub_packet, lsp = self.parse(data=sub_packets_data)
-            if sub_packet is None:
-                break
-            self._sub_packets.append(sub_packet)
-            sub_packets_data = sub_packets_data[lsp:]
-
-        if length is None:
-            length = offset + sum(len(x) for x in self._sub_packets)
-
-        super().__init__(version, typ, data[:length])
+            self._sub_packet_count = reader.read(11)
+        if self._end == reader.position or self._sub_packet_count == 0:
+            raise ValueError(f"Operator packet at bit {start} has no sub packets")
+
+        self._value: Optional[int] = None
+        self._version_sum = version
+        self._depth = 1
+        self._packet_count = 1
+
+    def is_complete(self, position: int) -> bool:
+        if self._end is not None:
+            return position >= self._end
+        return len(self._sub_packets) >= self._sub_packet_count
+
+    def add_sub_packet(self, packet: "BuoyancyInterchangeTransmissionPacket"):
+        self._sub_packets.append(packet)
+
+    def finish(self, position: int):
+        # Sub packets are finished before their parent, so everything can be aggregated right away
+        super().finish(position)
+        self._value = self._my_op(self._sub_packets)
+        self._version_sum = self._version + sum(x.get_version_sum() for x in self._sub_packets)
+        self._depth = max([x.get_depth() for x in self._sub_packets] + [0]) + 1
+        self._packet_count = sum(x.get_packet_count() for x in self._sub_packets) + 1
 
     def get_version_sum(self) -> int:
-        ret = self.get_version()
-        for p in self._sub_packets:
-            ret += p.get_version_sum()
-        return ret
+        return self._version_sum
 
     def get_value(self) -> int:
-        return self._my_op(self._sub_packets)
+        return self._value
 
     def get_depth(self) -> int:
-        return max([x.get_depth() for x in self._sub_packets] + [0]) + 1
+        return self._depth
 
     def get_packet_count(self) -> int:
-        return sum([x.get_packet_count() for x in self._sub_packets] + [0]) + 1
+        return self._packet_count
 
     def __repr__(self):
         return f"<{self.__class__.__name__}-{self.get_version()}, " \
@@ -1,7 +1,6 @@
 from abc import ABC, abstractmethod
 from typing import List, Dict, Type, Any, Union
-
-import numpy as np
+import math
 
 from .bits import BuoyancyInterchangeTransmissionPacket
 
@@ -77,7 +76,7 @@ class SumOp(BuoyancyInterchangeTransmissionOperator):
 class ProdOp(BuoyancyInterchangeTransmissionOperator):
 
     def __call__(self, packets: List[BuoyancyInterchangeTransmissionPacket]) -> int:
-        return int(np.prod([x.get_value() for x in packets]))
+        return math.prod(x.get_value() for x in packets)
 
     def print(self, packets: List[Any]) -> str:
         return f" * ".join(str(x) for x in packets)
@@ -3,7 +3,7 @@ import os
 import json
 import enum
 from queue import LifoQueue
-from itertools import permutations
+from concurrent.futures import ProcessPoolExecutor
 
 import numpy as np
 
@@ -32,28 +32,56 @@ def run_t1(data: List[str], log: Callable[[str], None]) -> Any:
     return mag
 
 
-@Task(year=2021, day=18, task=2)
-def run_t2(data: List[str], log: Callable[[str], Any]) -> Any:
+@Task(year=2021, day=18, task=2, extra_config={"workers": None})
+def run_t2(data: List[str], log: Callable[[str], Any], workers: Optional[int] = None) -> Any:
     snail_fish_numbers = [SnailFishNumber.parse(data=x) for x in data]
-    combs = list(permutations(range(len(snail_fish_numbers)), 2))
-    log(f"Testing {len(combs)} combinations of {len(snail_fish_numbers)} snailfish numbers")
-    ret = 0
-    best: List[SnailFishNumber] = []
-    for i, j in combs:
-        if i == j:
-            continue
-        n1 = snail_fish_numbers[i].copy()
-        n2 = snail_fish_numbers[j].copy()
-        a = SnailFishNumber.add(n1, n2)
-        mag = a.get_magnitude()
-        if mag > ret:
-            best = [n1, n2, a]
-            ret = mag
+    log(f"Testing {len(snail_fish_numbers) * (len(snail_fish_numbers) - 1)} combinations of "
+        f"{len(snail_fish_numbers)} snailfish numbers")
+    ret, i, j = best_pair(numbers=snail_fish_numbers, workers=workers)
 
     log("By adding")
-    log(f"{best[0]} +")
-    log(f"{best[1]} =")
-    log(f"{best[2]}")
+    log(f"{snail_fish_numbers[i]} +")
+    log(f"{snail_fish_numbers[j]} =")
+    log(f"{SnailFishNumber.add(snail_fish_numbers[i], snail_fish_numbers[j])}")
     log(f"You get a maximum magnitude of {ret}")
 
     return ret
+
+
+_worker_numbers: List[SnailFishNumber] = []
+
+
+def _init_worker(numbers: List[SnailFishNumber]):
+    global _worker_numbers
+    _worker_numbers = numbers
+
+
+def _best_in_rows(rows: Iterable[int], numbers: Optional[List[SnailFishNumber]] = None) -> Tuple[int, int, int]:
+    """
+    Biggest magnitude of numbers[i] + numbers[j] for all i in rows and every j != i
+    """
+    numbers = _worker_numbers if numbers is None else numbers
+    ret = (-1, -1, -1)
+    for i in rows:
+        for j in range(len(numbers)):
+            if i != j:
+                mag = SnailFishNumber.add(numbers[i], numbers[j]).get_magnitude()
+                if mag > ret[0]:
+                    ret = (mag, i, j)
+    return ret
+
+
+def best_pair(numbers: List[SnailFishNumber], workers: Optional[int] = None,
+              min_parallel: int = 200) -> Tuple[int, int, int]:
+    """
+    Magnitude and indices of the ordered pair with the biggest sum. Adding does not change the operands, so rows
+    of the n² pairs are spread over a process pool. Below min_parallel numbers the pool costs more than it saves
+    """
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    if workers <= 1 or len(numbers) < min_parallel:
+        return _best_in_rows(rows=range(len(numbers)), numbers=numbers)
+    chunks = [range(k, len(numbers), 4 * workers) for k in range(4 * workers)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(numbers,)) as pool:
+        results = list(pool.map(_best_in_rows, chunks))
+    # Ties go to the first pair in row major order, like the serial search
+    return max(results, key=lambda x: (x[0], -x[1], -x[2]))
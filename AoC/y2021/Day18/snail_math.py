@@ -1,222 +1,118 @@
-from abc import ABC, abstractmethod
-from enum import Enum, IntEnum
-from typing import List, Iterable, Tuple, Optional, Any
+from typing import List, Tuple, Optional, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class SnailFishNumber:
+    """
+    Snailfish number stored flat as its regular numbers from left to right together with how many pairs they are
+    nested in. The tree is implied: two neighbours of the same depth that are not split by a closing bracket form a
+    pair, so explode and split only touch their direct neighbours in the lists
+    """
+    __slots__ = ("values", "depths")
+
+    def __init__(self, values: List[int], depths: List[int]):
+        self.values = values
+        self.depths = depths
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def fold(self, leaf: Callable[[int], T], pair: Callable[[T, T], T]) -> T:
+        """
+        Rebuild the tree bottom up, leaf maps every regular number and pair joins two siblings
+        """
+        stack: List[Tuple[T, int]] = []
+        for value, depth in zip(self.values, self.depths):
+            item = leaf(value)
+            while len(stack) > 0 and stack[-1][1] == depth:
+                item, depth = pair(stack.pop()[0], item), depth - 1
+            stack.append((item, depth))
+        if len(stack) != 1 or stack[0][1] != 0:
+            raise ValueError(f"{self.values} with depths {self.depths} is not a snailfish number")
+        return stack[0][0]
 
+    def get_magnitude(self) -> int:
+        return self.fold(lambda x: x, lambda a, b: 3 * a + 2 * b)
 
-class ReduceType(Enum):
-    Explode = 1
-    Split = 2
-
-
-class Direction(IntEnum):
-    Left = -1
-    Right = 1
-
-
-class SnailFishNumber(ABC):
-    reduction_dtype = Tuple[bool, Optional[Tuple[ReduceType, Tuple[Any, ...]]]]
-
-    def __init__(self):
-        self._parent = None
-
-    def set_parent(self, parent: "SnailFishNumber") -> "SnailFishNumber":
-        self._parent = parent
-        return self
-
-    def get_parent(self) -> "SnailFishNumber":
-        return self._parent
-
-    def get_depth(self) -> int:
-        return 0 if self.get_parent() is None else self.get_parent().get_depth() + 1
-
-    @abstractmethod
-    def need_reduction(self) -> bool:
-        pass
-
-    @abstractmethod
-    def reduce(self, reduction_type: Optional[ReduceType] = None) -> reduction_dtype:
-        pass
-
-    @abstractmethod
     def __str__(self) -> str:
-        pass
-
-    @abstractmethod
-    def offer(self, value: "RegularNumber", offering_number: "SnailFishNumber", direction: Direction) -> bool:
-        pass
-
-    @abstractmethod
-    def get_magnitude(self) -> int:
-        pass
+        return self.fold(str, lambda a, b: f"[{a},{b}]")
 
-    @abstractmethod
     def copy(self) -> "SnailFishNumber":
-        pass
+        return self.__class__(self.values.copy(), self.depths.copy())
+
+    def _find_explode(self, start: int = 0) -> int:
+        # The first neighbours with the same depth nested in four pairs are always the leftmost pair to explode
+        depths = self.depths
+        for i in range(start, len(depths) - 1):
+            if depths[i] > 4 and depths[i] == depths[i + 1]:
+                return i
+        return -1
+
+    def _explode(self, i: int):
+        values, depths = self.values, self.depths
+        if i > 0:
+            values[i - 1] += values[i]
+        if i + 2 < len(values):
+            values[i + 2] += values[i + 1]
+        values[i:i + 2] = (0,)
+        depths[i:i + 2] = (depths[i] - 1,)
+
+    def _split(self, i: int):
+        value, depth = self.values[i], self.depths[i] + 1
+        self.values[i:i + 1] = (value // 2, value - value // 2)
+        self.depths[i:i + 1] = (depth, depth)
+
+    def reduce(self) -> "SnailFishNumber":
+        start = 0
+        while True:
+            i = self._find_explode(start=start)
+            if i >= 0:
+                self._explode(i)
+                # Merging the pair can only create a new pair with its left neighbour
+                start = max(i - 1, 0)
+                continue
+            i = next((i for i, v in enumerate(self.values) if v >= 10), -1)
+            if i < 0:
+                return self
+            self._split(i)
+            start = i
 
     @classmethod
     def parse(cls, data: str, auto_reduce: bool = True) -> "SnailFishNumber":
-        data = data.strip()
+        values, depths = [], []
+        depth = 0
+        current: Optional[int] = None
+        for d in data.strip():
+            if d.isdigit():
+                current = int(d) if current is None else 10 * current + int(d)
+                continue
+            if current is not None:
+                values.append(current)
+                depths.append(depth)
+                current = None
+            if d == "[":
+                depth += 1
+            elif d == "]":
+                depth -= 1
+            elif d != ",":
+                raise ValueError(f"Could not parse {data} as a {cls.__name__}")
+        if current is not None:
+            values.append(current)
+            depths.append(depth)
+        ret = cls(values, depths)
         try:
-            int_data = int(data)
-            ret = RegularNumber(value=int_data)
+            ret.fold(lambda x: None, lambda a, b: None)
         except ValueError:
-            if data[0] != "[" or data[-1] != "]":
-                raise ValueError(f"Could not parse {data} as a {cls.__name__}")
-
-            current_child: List[str] = []
-            found_children: List[List[str]] = []
-            stack = 0
-            for d in data[1:-1]:
-                if d == "," and stack == 0:
-                    found_children.append(current_child)
-                    current_child = []
-                else:
-                    current_child.append(d)
-                    if d == "[":
-                        stack += 1
-                    elif d == "]":
-                        stack -= 1
-            found_children.append(current_child)
-            if stack != 0 or len(found_children) != 2 or any(len(x) == 0 for x in found_children):
-                raise ValueError(f"Could not parse {data} as a {cls.__name__}")
-            c1 = cls.parse(data="".join(found_children[0]), auto_reduce=False)
-            c2 = cls.parse(data="".join(found_children[1]), auto_reduce=False)
-            ret = PairNumber(c1, c2)
+            raise ValueError(f"Could not parse {data} as a {cls.__name__}")
         if auto_reduce:
-            ret = cls.auto_reduce(number=ret)
+            ret.reduce()
         return ret
 
-    @classmethod
-    def auto_reduce(cls, number: "SnailFishNumber") -> "SnailFishNumber":
-        to_reduce = True
-        while to_reduce:
-            to_reduce, *_ = number.reduce(reduction_type=ReduceType.Explode)
-            if to_reduce:
-                continue
-            to_reduce, *_ = number.reduce(reduction_type=ReduceType.Split)
-        return number
-
     @classmethod
     def add(cls, n1: "SnailFishNumber", n2: "SnailFishNumber") -> "SnailFishNumber":
-        ret = PairNumber(n1, n2)
-        return cls.auto_reduce(number=ret)
-
-
-class RegularNumber(SnailFishNumber):
-
-    def __init__(self, value: int):
-        super().__init__()
-        self._value = value
-
-    def get_value(self) -> int:
-        return self._value
-
-    def get_magnitude(self) -> int:
-        return self.get_value()
-
-    def offer(self, value: "RegularNumber", offering_number: "SnailFishNumber", direction: Direction) -> bool:
-        self._value += value.get_value()
-        return True
-
-    def need_reduction(self) -> bool:
-        if self.get_value() >= 10:
-            return True
-
-    def reduce(self, reduction_type: Optional[ReduceType] = None) -> SnailFishNumber.reduction_dtype:
-        if self.need_reduction() and (reduction_type is None or reduction_type == ReduceType.Split):
-            left = self.get_value() // 2
-            right = self.get_value() - left
-            left_number = RegularNumber(left)
-            right_number = RegularNumber(right)
-            new_number = PairNumber(left_number, right_number).set_parent(self.get_parent())
-            return True, (ReduceType.Split, (new_number,))
-        return False, None
-
-    def __str__(self) -> str:
-        return str(self.get_value())
-
-    def copy(self) -> "SnailFishNumber":
-        return self.__class__(self.get_value())
-
-
-class PairNumber(SnailFishNumber):
-
-    def __init__(self, *children: "SnailFishNumber"):
-        super().__init__()
-        if len(children) != 2:
-            raise ValueError(f"I can only have 2 children. You wanted to give me {len(children)}")
-        for c in children:
-            c.set_parent(self)
-        self._children: List[SnailFishNumber] = list(children)
-
-    def get_magnitude(self) -> int:
-        return 3 * self[0].get_magnitude() + 2 * self[1].get_magnitude()
-
-    def offer(self, value: "RegularNumber", offering_number: "SnailFishNumber", direction: Direction) -> bool:
-        try:
-            i = self._children.index(offering_number)
-            if direction == Direction.Left:
-                idx: List[int] = list(range(i - 1, -1, -1))
-            elif direction == Direction.Right:
-                idx: List[int] = list(range(i + 1, len(self), 1))
-            else:
-                idx: List[int] = []
-        except ValueError:
-            idx = list(range(len(self)))
-            if direction == Direction.Left:
-                idx = idx[::-1]
-
-        for j in idx:
-            if self[j].offer(value=value, offering_number=self, direction=direction):
-                return True
-        par = self.get_parent()
-        if par is not None:
-            if par.offer(value=value, offering_number=self, direction=direction):
-                return True
-        return False
-
-    def __getitem__(self, idx: int) -> SnailFishNumber:
-        if 0 <= idx < len(self):
-            return self._children[idx]
-        raise ValueError(f"I only have {len(self)} children. You wanted to get the {idx + 1}.")
-
-    def __len__(self):
-        return len(self._children)
-
-    def __iter__(self) -> Iterable[SnailFishNumber]:
-        for i in range(len(self)):
-            yield self[i]
-
-    def need_reduction(self) -> bool:
-        if self.get_depth() >= 4 and all(isinstance(x, RegularNumber) for x in self):
-            return True
-        return False
-
-    def reduce(self, reduction_type: Optional[ReduceType] = None) -> SnailFishNumber.reduction_dtype:
-        if self.need_reduction() and (reduction_type is None or reduction_type == ReduceType.Explode):
-            return True, (ReduceType.Explode, (self[0], self[1]))
-
-        for i in range(len(self)):
-            number = self[i]
-            reduced, data = number.reduce(reduction_type=reduction_type)
-            if reduced:
-                if data is not None:
-                    typ, reduced_data = data
-                    if typ == ReduceType.Split:
-                        new_number: SnailFishNumber = reduced_data[0]
-                        new_number.set_parent(self)
-                        self._children[i] = new_number
-                    elif typ == ReduceType.Explode:
-                        left: RegularNumber = reduced_data[0]
-                        right: RegularNumber = reduced_data[1]
-                        self.offer(value=left, offering_number=number, direction=Direction.Left)
-                        self.offer(value=right, offering_number=number, direction=Direction.Right)
-                        self._children[i] = RegularNumber(value=0).set_parent(self)
-                return True, None
-        return False, None
-
-    def __str__(self) -> str:
-        return f"[{','.join(str(x) for x in self)}]"
-
-    def copy(self) -> "SnailFishNumber":
-        return self.__class__(*[x.copy() for x in self._children])
+        """
+        Sum of both numbers as a new number, n1 and n2 stay untouched
+        """
+        ret = cls(n1.values + n2.values, [d + 1 for d in n1.depths] + [d + 1 for d in n2.depths])
+        return ret.reduce()
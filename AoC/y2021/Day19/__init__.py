@@ -1,4 +1,4 @@
-from typing import Callable, AnyStr, List, Any, Optional, Dict, Tuple, Iterable, Set, Union, Iterator
+from typing import Callable, List, Any, Optional, Dict, Tuple, Iterable, Union, Iterator
 import os
 import json
 import enum
@@ -6,17 +6,19 @@ import queue
 import itertools
 from queue import LifoQueue
 from itertools import permutations
-from functools import lru_cache
 
 import numpy as np
 from scipy.spatial import distance
-import matplotlib
-import matplotlib.pyplot as plt
 
 from AoC_Companion.Day import Task
 from AoC_Companion.test import TestData
 from AoC_Companion.Preprocess import Preprocessor
 
+from ...lazy import lazy_import
+
+matplotlib = lazy_import("matplotlib")
+plt = lazy_import("matplotlib.pyplot")
+
 
 pt_type = np.ndarray
 scan_type = np.ndarray
@@ -50,7 +52,7 @@ def run_t1(data: List[scan_type], log: Callable[[str], None]) -> Any:
     return probes.shape[0]
 
 
-@Task(year=2021, day=19, task=2, extra_config={"_visualization": AnyStr})
+@Task(year=2021, day=19, task=2, extra_config={"_visualization": False})
 def run_t2(data: Any, log: Callable[[str], None], _visualization: bool) -> Any:
     scanners, probes = find_scanners_and_probes(data=data)
     log(f"There are {len(scanners)} scanners and {probes.shape[0]} probes")
@@ -70,84 +72,134 @@ def run_t2(data: Any, log: Callable[[str], None], _visualization: bool) -> Any:
     return int(distances[0][-1])
 
 
-def find_scanners_and_probes(data: List[scan_type]) -> Tuple[Dict[Tuple[int, int, int], scan_type], scan_type]:
-    probes: scan_type = data[0].copy()
-    scanner_positions: Dict[Tuple[int, int, int], scan_type] = {(0, 0, 0): data[0]}
-    unsafe: queue.Queue[Tuple[int, scan_type]] = queue.Queue(len(data) - 1)
-    for i, d in enumerate(data[1:]):
-        unsafe.put((i + 1, d))
-
-    while not unsafe.empty():
-        i, candidate = unsafe.get()
-        found = False
-        for moved_scanner in permute_scanner(base=candidate):
-            common = find_common_beacons(scanner1=probes, scanner2=moved_scanner)
-            if common is not None:
-                common1, common2, confidence = common
-                scanner_pos = common1 - common2
-                probe_pos = moved_scanner + scanner_pos
-                scanner_positions[tuple(scanner_pos)] = probe_pos
-                probes = np.unique(np.concatenate((probes, probe_pos), axis=0), axis=0)
-                found = True
-                break
-        if not found:
-            if unsafe.empty():
-                raise Exception(f"There was no way to determine scanner {i}")
-            unsafe.put((i, candidate))
-
+def find_scanners_and_probes(
+        data: List[scan_type], min_common: int = 12
+) -> Tuple[Dict[Tuple[int, int, int], scan_type], scan_type]:
+    """
+    Position of every scanner and all probes relative to scanner 0. Scanners that could overlap are found by their
+    shared distance fingerprints first, only those pairs are aligned and the alignments are chained from scanner 0
+    """
+    fingerprints = [get_fingerprints(scanner=d) for d in data]
+    candidates = overlap_candidates(fingerprints=fingerprints, min_shared=min_common * (min_common - 1) // 2)
+
+    # Scanner s sees point x at rotations[s] @ x + translations[s] in the frame of scanner 0
+    rotations: Dict[int, np.ndarray] = {0: np.eye(3, dtype=int)}
+    translations: Dict[int, np.ndarray] = {0: np.zeros(3, dtype=int)}
+    todo = queue.Queue()
+    todo.put(0)
+    while not todo.empty():
+        a = todo.get()
+        for b in candidates[a]:
+            if b in rotations:
+                continue
+            alignment = align_scanners(scanner1=data[a], scanner2=data[b], fingerprints1=fingerprints[a],
+                                       fingerprints2=fingerprints[b], min_common=min_common)
+            if alignment is None:
+                continue
+            rotation, translation = alignment
+            rotations[b] = rotations[a] @ rotation
+            translations[b] = rotations[a] @ translation + translations[a]
+            todo.put(b)
+
+    missing = [i for i in range(len(data)) if i not in rotations]
+    if len(missing) > 0:
+        raise Exception(f"There was no way to determine scanner {missing[0]}")
+
+    scanner_positions: Dict[Tuple[int, int, int], scan_type] = {}
+    for i in sorted(rotations.keys()):
+        scanner_positions[tuple(int(x) for x in translations[i])] = data[i] @ rotations[i].T + translations[i]
+    probes = np.unique(np.concatenate(list(scanner_positions.values()), axis=0), axis=0)
     return scanner_positions, probes
 
 
-def permute_scanner(base) -> Iterator[scan_type]:
+def _rotations() -> np.ndarray:
+    ret = []
     for dir_x, dir_y in itertools.permutations(range(3), 2):
         for sign_x, sign_y in itertools.product((-1, 1), (-1, 1)):
-            x_vec = np.zeros((3,))
-            y_vec = np.zeros((3,))
+            x_vec = np.zeros((3,), dtype=int)
+            y_vec = np.zeros((3,), dtype=int)
             x_vec[dir_x] = sign_x
             y_vec[dir_y] = sign_y
-            z_vec = np.cross(x_vec, y_vec)
-
-            ret = np.stack((np.dot(base, x_vec), np.dot(base, y_vec), np.dot(base, z_vec)), axis=1)
-
-            yield ret
-
-
-def get_offset_dict(scanner: scan_type) -> List[Tuple[pt_type, Set[Tuple[int, ...]]]]:
-    unique_identifier: Tuple[Tuple[int, ...]] = tuple({tuple(x) for x in scanner})
-    return _get_offset_dict(unique_identifier=unique_identifier)
-
-
-@lru_cache()
-def _get_offset_dict(unique_identifier: Tuple[Tuple[int, ...]]):
-    tmp_identifier = np.array(unique_identifier)
-    offset_dict: List[Tuple[pt_type, Set[Tuple[int, ...]]]] = []
-    for x in tmp_identifier:
-        tmp = x - tmp_identifier
-        offset_dict.append((x, set(tuple(y) for y in tmp)))
-    offset_dict: List[Tuple[pt_type, Set[Tuple[int, ...]]]] = [
-        (x, set(tuple(x - y) for y in tmp_identifier)) for x in tmp_identifier
-    ]
-    return offset_dict
-
-
-def find_common_beacons(scanner1: scan_type, scanner2: scan_type) -> Optional[Tuple[pt_type, pt_type, int]]:
-
-    offsets1 = get_offset_dict(scanner=scanner1)
-    offsets2 = get_offset_dict(scanner=scanner2)
-
-    if len(offsets1) != scanner1.shape[0] or len(offsets2) != scanner2.shape[0]:
-        raise Exception()
-
-    for s1, s1o in offsets1:
-        for s2, s2o in offsets2:
-            intersecting_points = len(set.intersection(s1o, s2o))
-            if intersecting_points >= 12:
-                return np.array(s1), np.array(s2), intersecting_points
-
+            ret.append(np.stack((x_vec, y_vec, np.cross(x_vec, y_vec))))
+    return np.array(ret)
+
+
+ROTATIONS = _rotations()
+
+
+def permute_scanner(base: scan_type) -> Iterator[scan_type]:
+    for rotation in ROTATIONS:
+        yield base @ rotation.T
+
+
+def get_fingerprints(scanner: scan_type) -> Dict[Tuple[int, int, int], List[Tuple[int, int]]]:
+    """
+    Probe pairs of a scanner by their sorted absolute offsets, which stay the same in every orientation
+    """
+    i, j = np.triu_indices(scanner.shape[0], k=1)
+    offsets = np.sort(np.abs(scanner[j] - scanner[i]), axis=1)
+    ret: Dict[Tuple[int, int, int], List[Tuple[int, int]]] = {}
+    for key, p1, p2 in zip(map(tuple, offsets.tolist()), i.tolist(), j.tolist()):
+        ret.setdefault(key, []).append((p1, p2))
+    return ret
+
+
+def overlap_candidates(
+        fingerprints: List[Dict[Tuple[int, int, int], List[Tuple[int, int]]]], min_shared: int
+) -> List[List[int]]:
+    """
+    For every scanner the scanners sharing at least min_shared fingerprints with it, most shared first.
+    Scanners with n common probes share at least n * (n - 1) / 2 fingerprints, so no overlap is missed
+    """
+    index: Dict[Tuple[int, int, int], List[Tuple[int, int]]] = {}
+    for s, f in enumerate(fingerprints):
+        for key, pairs in f.items():
+            index.setdefault(key, []).append((s, len(pairs)))
+    shared: Dict[Tuple[int, int], int] = {}
+    for scanners in index.values():
+        for (s1, c1), (s2, c2) in itertools.combinations(scanners, 2):
+            shared[(s1, s2)] = shared.get((s1, s2), 0) + min(c1, c2)
+    ret: List[List[Tuple[int, int]]] = [[] for _ in fingerprints]
+    for (s1, s2), count in shared.items():
+        if count >= min_shared:
+            ret[s1].append((count, s2))
+            ret[s2].append((count, s1))
+    return [[s for _, s in sorted(x, key=lambda y: (-y[0], y[1]))] for x in ret]
+
+
+def align_scanners(
+        scanner1: scan_type, scanner2: scan_type,
+        fingerprints1: Dict[Tuple[int, int, int], List[Tuple[int, int]]],
+        fingerprints2: Dict[Tuple[int, int, int], List[Tuple[int, int]]],
+        min_common: int = 12,
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Rotation and translation moving probes of scanner2 into the frame of scanner1 so that at least min_common
+    probes coincide. Only rotations turning a shared fingerprint of scanner2 into the one of scanner1 are checked
+    """
+    known = {tuple(x) for x in scanner1.tolist()}
+    tried = set()
+    for key in fingerprints1.keys() & fingerprints2.keys():
+        (i, j), (k, l) = fingerprints1[key][0], fingerprints2[key][0]
+        offset1, offset2 = scanner1[j] - scanner1[i], scanner2[l] - scanner2[k]
+        for r, rotation in enumerate(ROTATIONS):
+            moved = rotation @ offset2
+            if np.array_equal(moved, offset1):
+                translation = scanner1[i] - rotation @ scanner2[k]
+            elif np.array_equal(moved, -offset1):
+                translation = scanner1[i] - rotation @ scanner2[l]
+            else:
+                continue
+            if (r, *translation.tolist()) in tried:
+                continue
+            tried.add((r, *translation.tolist()))
+            moved_scanner = scanner2 @ rotation.T + translation
+            if sum(1 for x in moved_scanner.tolist() if tuple(x) in known) >= min_common:
+                return rotation, translation
     return None
 
 
-def plot(scanners: Dict[Tuple[int, int, int], scan_type], probes: scan_type) -> plt.Figure:
+def plot(scanners: Dict[Tuple[int, int, int], scan_type], probes: scan_type) -> "plt.Figure":
     fig: plt.Figure = plt.figure()
     ax: plt.Axes = fig.add_subplot(projection='3d')
     c_map = plt.get_cmap("autumn")
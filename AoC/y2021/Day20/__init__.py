@@ -9,10 +9,6 @@ from itertools import permutations
 from functools import lru_cache
 
 import numpy as np
-from scipy.spatial import distance
-from scipy.signal import convolve2d
-import matplotlib
-import matplotlib.pyplot as plt
 
 from AoC_Companion.Day import Task
 from AoC_Companion.test import TestData
@@ -50,14 +46,11 @@ def run_t2(
 
 def run(data: Any, log: Callable[[str], None], steps: int, create_visual: bool) -> Any:
     algorithm, image = data
-    images = [image]
-    for i in range(steps):
-        image = step(image=image, algorithm=algorithm, i=i)
-        images.append(image)
-    ret = np.sum(image)
-    log(f"Initial image had a size of {images[0].shape[1]}x{images[0].shape[0]}")
+    final, images = enhance(image=image, algorithm=algorithm, steps=steps, keep_frames=create_visual)
+    ret = int(np.sum(final))
+    log(f"Initial image had a size of {image.shape[1]}x{image.shape[0]}")
     log(f"Running enhancement for {steps} steps")
-    log(f"Final image has a size of {images[-1].shape[1]}x{images[-1].shape[0]}")
+    log(f"Final image has a size of {final.shape[1]}x{final.shape[0]}")
     log(f"  In the final image {ret} pixels where lit")
     if create_visual:
         target = os.path.join(os.path.dirname(__file__), f"Day20-{steps}.gif")
@@ -66,13 +59,56 @@ def run(data: Any, log: Callable[[str], None], steps: int, create_visual: bool)
     return ret
 
 
-def step(image: np.ndarray, algorithm: np.ndarray, size: int = 3, i: int = 0) -> np.ndarray:
-    kernel = (2 ** np.arange(size * size)).reshape((size, size))
-    void_val = get_void(algorithm=algorithm, i=i)
-    # image = np.pad(image, 2, mode="constant", constant_values=void_val)
-    image_conv2d = convolve2d(image, kernel, mode="full", fillvalue=void_val)
-    image = algorithm[image_conv2d].astype(image.dtype)
-    return image
+def enhance(
+        image: np.ndarray, algorithm: np.ndarray, steps: int, first_step: int = 0, keep_frames: bool = False
+) -> Tuple[np.ndarray, List[np.ndarray]]:
+    """
+    Image after running the enhancement steps times, every step grows it by one pixel on each side.
+    All buffers are allocated once for the final size, so memory does not depend on the number of steps.
+    Returns the final image and, if keep_frames is set, the image before every step and the final one
+    """
+    lut = np.asarray(algorithm, dtype=np.uint8)
+    height, width = image.shape
+    margin = steps + 1
+    buffers = [np.zeros((height + 2 * margin, width + 2 * margin), dtype=np.uint8) for _ in range(2)]
+    # 3 bit codes of each pixel and its horizontal neighbours, then the 9 bit codes of the 3x3 blocks
+    rows = np.empty((buffers[0].shape[0], buffers[0].shape[1] - 2), dtype=np.uint16)
+    codes = np.empty((buffers[0].shape[0] - 2, buffers[0].shape[1] - 2), dtype=np.uint16)
+    tmp = np.empty_like(rows)
+
+    src, dst = buffers
+    src[margin:margin + height, margin:margin + width] = image != 0
+    frames: List[np.ndarray] = []
+    for i in range(steps):
+        top, bottom, left, right = margin - i, margin + height + i, margin - i, margin + width + i
+        if keep_frames:
+            frames.append(src[top:bottom, left:right].copy())
+        # Everything outside of the image is void, two pixels of it are needed for the grown image
+        window = src[top - 2:bottom + 2, left - 2:right + 2]
+        void_val = get_void(algorithm=algorithm, i=first_step + i)
+        window[:2], window[-2:], window[:, :2], window[:, -2:] = void_val, void_val, void_val, void_val
+
+        h, w = window.shape
+        r, c, t = rows[:h, :w - 2], codes[:h - 2, :w - 2], tmp[:h, :w - 2]
+        np.left_shift(window[:, :-2], 2, out=r)
+        np.left_shift(window[:, 1:-1], 1, out=t)
+        np.bitwise_or(r, t, out=r)
+        np.bitwise_or(r, window[:, 2:], out=r)
+        np.left_shift(r[:-2], 6, out=c)
+        np.left_shift(r[1:-1], 3, out=t[:h - 2])
+        np.bitwise_or(c, t[:h - 2], out=c)
+        np.bitwise_or(c, r[2:], out=c)
+        np.take(lut, c, out=dst[top - 1:bottom + 1, left - 1:right + 1])
+        src, dst = dst, src
+
+    final = src[1:-1, 1:-1] if steps > 0 else src[margin:margin + height, margin:margin + width]
+    if keep_frames:
+        frames.append(final.copy())
+    return final, frames
+
+
+def step(image: np.ndarray, algorithm: np.ndarray, i: int = 0) -> np.ndarray:
+    return enhance(image=image, algorithm=algorithm, steps=1, first_step=i)[0].astype(image.dtype)
 
 
 def get_void(algorithm: np.ndarray, i: int):
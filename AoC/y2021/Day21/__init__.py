@@ -6,13 +6,8 @@ import queue
 import itertools
 from queue import LifoQueue
 from itertools import permutations
-from functools import lru_cache
 
 import numpy as np
-from scipy.spatial import distance
-from scipy.signal import convolve2d
-import matplotlib
-import matplotlib.pyplot as plt
 
 from AoC_Companion.Day import Task
 from AoC_Companion.test import TestData
@@ -52,9 +47,9 @@ def run_t1(data: Tuple[int, int], log: Callable[[str], None]) -> Any:
     return ret
 
 
-# @Task(year=2021, day=21, task=2)
-def run_t2(data: Tuple[int, int], log: Callable[[str], None]) -> Any:
-    wins: Tuple[int, int] = play_q_game(data[0], data[1], 0, 0, True, 0, 0)
+@Task(year=2021, day=21, task=2, extra_config={"target": 21, "board": 10})
+def run_t2(data: Tuple[int, int], log: Callable[[str], None], target: int = 21, board: int = 10) -> Any:
+    wins = quantum_wins(start_p1=data[0], start_p2=data[1], target=target, board=board)
     num_realities = sum(wins)
     ret = max(wins)
     log(f"While playing 'Dirac Dice' with the quantum die you split the reality in {num_realities} versions")
@@ -77,37 +72,44 @@ def play_game(start_p1: int, start_p2: int, die: _get_die, target_points) -> Tup
     return tuple(points), i
 
 
-def add_tuple(x: Tuple[int, ...], y: Tuple[int, ...]) -> Tuple[int, ...]:
-    return tuple(a + b for a, b in zip(x, y))
-
-
-@lru_cache()
-def play_q_game(
-        position_p1: int, position_p2: int, score_p1: int, score_p2: int, turn_p1: bool, cur_roll: int, rolls: int
-) -> Tuple[int, int]:
-    if score_p1 >= 21:
-        return 1, 0
-    if score_p2 >= 21:
-        return 0, 1
-    out = (0, 0)
-    if rolls != 3:
-        for i in range(1, 4):
-            out = add_tuple(
-                out,
-                play_q_game(position_p1, position_p2, score_p1, score_p2, turn_p1, cur_roll + i, rolls + 1)
-            )
-    else:
-        cur = position_p1 if turn_p1 else position_p2
-        cur += cur_roll
-        cur = ((cur - 1) % 10) + 1
-        if turn_p1:
-            out = add_tuple(
-                out,
-                play_q_game(cur, position_p2, score_p1 + cur, score_p2, not turn_p1, 0, 0)
-            )
-        else:
-            out = add_tuple(
-                out,
-                play_q_game(position_p1, cur, score_p1, score_p2 + cur, not turn_p1, 0, 0)
-            )
-    return out
+def roll_distribution(sides: int = 3, rolls: int = 3) -> Dict[int, int]:
+    """
+    In how many universes each sum of a turn's rolls happens
+    """
+    ret: Dict[int, int] = {}
+    for roll in itertools.product(range(1, sides + 1), repeat=rolls):
+        ret[sum(roll)] = ret.get(sum(roll), 0) + 1
+    return ret
+
+
+def quantum_wins(start_p1: int, start_p2: int, target: int = 21, board: int = 10) -> Tuple[int, int]:
+    """
+    Universes won by each player with the quantum die. All universes with the same positions and scores are
+    counted together in a table indexed by (position, score) of the player to move and the other player.
+    A turn moves every cell by each of the 7 roll sums at once and swaps the players
+    """
+    if not (1 <= start_p1 <= board and 1 <= start_p2 <= board):
+        raise ValueError(f"Start positions {start_p1} and {start_p2} are not on a board of size {board}")
+    outcomes = roll_distribution()
+    # table[pos_mover, pos_other, score_mover, score_other], positions are 0 based
+    table = np.zeros((board, board, target, target), dtype=np.int64)
+    # Counts outgrow int64 for big targets, switch to python ints before a turn or a sum over the table could overflow
+    limit = np.iinfo(np.int64).max // (sum(outcomes.values()) * table.size)
+    table[start_p1 - 1, start_p2 - 1, 0, 0] = 1
+    wins = [0, 0]
+    player = 0
+    while table.any():
+        if table.dtype != object and table.max() > limit:
+            table = table.astype(object)
+        new = np.zeros_like(table)
+        for roll, count in outcomes.items():
+            for pos in range(board):
+                src = table[(pos - roll) % board]
+                gain = pos + 1
+                wins[player] += count * int(src[:, max(target - gain, 0):, :].sum())
+                if gain < target:
+                    # The mover becomes the other player, so positions and scores swap their axes
+                    new[:, pos, :, gain:] += count * src[:, :target - gain, :].transpose(0, 2, 1)
+        table = new
+        player = 1 - player
+    return wins[0], wins[1]
@@ -10,10 +10,6 @@ from functools import lru_cache
 from collections import Counter
 
 import numpy as np
-from scipy.spatial import distance
-from scipy.signal import convolve2d
-import matplotlib
-import matplotlib.pyplot as plt
 
 from AoC_Companion.Day import Task
 from AoC_Companion.test import TestData
@@ -46,12 +42,12 @@ def pre_process_input(data: Any) -> Any:
 def run_t1(data: List[_operation], log: Callable[[str], None]) -> Any:
     small_range: Tuple[int, int] = (-50, 50)
     ranges: List[Tuple[int, int]] = [small_range for _ in range(len(data[0]) - 1)]
-    return _run(ranges=ranges, ops=data, sim_method=sim_reactor_f, log=log)
+    return _run(ranges=ranges, ops=data, sim_method=choose_sim_method(ranges=ranges, ops=data), log=log)
 
 
 @Task(year=2021, day=22, task=2)
 def run_t2(data: List[_operation], log: Callable[[str], None]) -> Any:
-    return _run(ops=data, sim_method=sim_reactor_f, log=log)
+    return _run(ops=data, sim_method=choose_sim_method(ranges=None, ops=data), log=log)
 
 
 def _run(
@@ -68,6 +64,7 @@ def _run(
         c = {0: "x", 1: "y", 2: "z"}
         for i, r in enumerate(ranges):
             log(f"  {c.get(i, '_')} from {r[0]} to {r[1]}")
+    log(f"Simulating the reactor with {sim_method.__name__}")
     ret = int(sim_method(ranges, ops, log))
     if ranges is None:
         full_area = "<ERROR>"
@@ -137,6 +134,83 @@ def sim_reactor_f(ranges: Optional[Iterable[_coord_range]], ops: List[_operation
     return sum(patch.get_size() * counted for patch, counted in cuboid_signs.items())
 
 
+# Rough cost of one signed cuboid comparison in python relative to writing one cell of the compressed volume
+_SIGNED_COST = 1000
+
+
+def _compress(
+        ranges: Optional[Iterable[_coord_range]], ops: List[_operation]
+) -> Tuple[List[np.ndarray], np.ndarray, np.ndarray]:
+    """
+    Distinct cuboid borders per axis and for every operation its on flag and its half open index range in them
+    """
+    if ranges is not None:
+        ranges = list(ranges)
+        clipped = [(op, tuple(adjust_range(r=b, max_shape=r, offset=0) for b, r in zip(bounds, ranges)))
+                   for op, *bounds in ops]
+        ops = [(op, *bounds) for op, bounds in clipped if all(b is not None for b in bounds)]
+    if len(ops) <= 0:
+        return [np.zeros(1, dtype=np.int64) for _ in range(3)], np.zeros((0, 6), dtype=np.int64), np.zeros(0, bool)
+    on = np.array([op for op, *_ in ops], dtype=bool)
+    borders = np.array([[b for r in bounds for b in (min(r), max(r) + 1)] for _, *bounds in ops], dtype=np.int64)
+    axes = [np.unique(borders[:, 2 * a:2 * a + 2]) for a in range(borders.shape[1] // 2)]
+    idx = np.stack([np.searchsorted(axes[a // 2], borders[:, a]) for a in range(borders.shape[1])], axis=1)
+    return axes, idx, on
+
+
+def _overlapping_pairs(idx: np.ndarray, block: int = 1024) -> int:
+    ret = 0
+    for start in range(0, idx.shape[0], block):
+        part = idx[start:start + block]
+        overlap = np.all((part[:, None, ::2] < idx[None, :, 1::2]) & (idx[None, :, ::2] < part[:, None, 1::2]), axis=2)
+        ret += int(np.count_nonzero(overlap))
+    return (ret - idx.shape[0]) // 2
+
+
+def choose_sim_method(
+        ranges: Optional[Iterable[_coord_range]], ops: List[_operation]
+) -> Callable[[Optional[Iterable[_coord_range]], List[_operation], Callable[[str], None]], int]:
+    """
+    The compressed volume costs a write per covered cell. The signed cuboids compare every operation with all
+    registered cuboids, whose number grows with the overlapping pairs of operations and explodes with deep overlaps.
+    Pick whichever should be cheaper for these operations
+    """
+    axes, idx, _ = _compress(ranges=ranges, ops=ops)
+    cells = int(np.prod([len(a) - 1 for a in axes], dtype=object))
+    writes = cells + int(np.prod(idx[:, 1::2] - idx[:, ::2], axis=1, dtype=object).sum())
+    comparisons = len(ops) ** 2 + _overlapping_pairs(idx=idx) ** 2
+    if writes <= _SIGNED_COST * comparisons:
+        return sim_reactor_c
+    return sim_reactor_f
+
+
+def sim_reactor_c(
+        ranges: Optional[Iterable[_coord_range]], ops: List[_operation], log: Callable[[str], None],
+        max_cells: int = 1 << 24
+) -> int:
+    """
+    Replay the operations on a boolean volume with one cell per box between neighbouring cuboid borders.
+    The volume is built in slabs along x of at most max_cells cells, at least one plane at a time
+    """
+    axes, idx, on = _compress(ranges=ranges, ops=ops)
+    widths = [np.diff(a) for a in axes]
+    nx, ny, nz = (len(w) for w in widths)
+    chunk = max(1, max_cells // max(ny * nz, 1))
+    log(f"Compressed the reactor to {nx}x{ny}x{nz} cells, handled {chunk} x planes at a time")
+
+    ret = 0
+    volume = np.zeros((min(chunk, nx), ny, nz), dtype=bool)
+    for start in range(0, nx, chunk):
+        stop = min(start + chunk, nx)
+        volume[:] = False
+        for k in np.flatnonzero((idx[:, 0] < stop) & (idx[:, 1] > start)):
+            x0, x1, y0, y1, z0, z1 = idx[k]
+            volume[max(x0, start) - start:min(x1, stop) - start, y0:y1, z0:z1] = on[k]
+        for i in range(stop - start):
+            ret += int(widths[0][start + i]) * int(widths[1] @ (volume[i] @ widths[2]))
+    return ret
+
+
 def adjust_range(r: _coord_range, offset: int, max_shape: Tuple[int, int]) -> Optional[_coord_range]:
     _adjusted: Tuple[int, ...] = tuple(_x - offset for _x in r)
     if _adjusted[0] > max_shape[1] or _adjusted[1] < max_shape[0]:
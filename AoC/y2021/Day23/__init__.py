@@ -10,16 +10,12 @@ from functools import lru_cache
 from collections import Counter
 
 import numpy as np
-from scipy.spatial import distance
-from scipy.signal import convolve2d
-import matplotlib
-import matplotlib.pyplot as plt
 
 from AoC_Companion.Day import Task
 from AoC_Companion.test import TestData
 from AoC_Companion.Preprocess import Preprocessor
 
-from .building import Hallway, Amphipod, AmphipodTypes, Room, State
+from .building import Hallway, Amphipod, AmphipodTypes, Room, Burrow
 
 
 with open(os.path.join(os.path.dirname(__file__), "config.json"), "r") as f_in:
@@ -65,8 +61,12 @@ def run_t2(data: Hallway, log: Callable[[str], None], longer_rooms: Dict[int, Li
 
 
 def _run(data: Hallway, log: Callable[[str], None]) -> Any:
-    state = State(hallway=data)
-    solve_energy, solved_hallway = State.solve(init_state=state)
+    burrow = Burrow(hallway=data)
+    solve_energy, solved_state = burrow.solve()
+    if solved_state is None:
+        log("There is no way to sort these amphipods")
+        return None
+    solved_hallway = burrow.decode(state=solved_state)
     log("From:")
     for s in str(data).split("\n"):
         log(s)
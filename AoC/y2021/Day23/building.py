@@ -1,12 +1,8 @@
 import copy
+import heapq
 import math
-import queue
-from dataclasses import dataclass, field
 from enum import Enum
-from typing import List, Optional, Iterable, Tuple, Any, Union, Callable, Dict, Set
-
-from scipy.sparse.csgraph import dijkstra
-from scipy.sparse import csr_matrix, lil_matrix
+from typing import List, Optional, Iterable, Tuple, Union, Dict, Set
 
 
 class AmphipodTypes(Enum):
@@ -289,155 +285,141 @@ class Hallway:
         return hash((self.__class__.__name__, tuple(self.hallway)))
 
 
-class State:
-    _COUNTER = 0
+class Burrow:
+    """
+    Layout of a hallway with its rooms. A burrow state is encoded as a flat tuple: the hallway tiles followed by
+    the spaces of every room from top to bottom, each holding the room index of its amphipod or EMPTY
+    """
+    EMPTY = -1
 
-    @classmethod
-    def solve(cls, init_state: "State") -> Tuple[int, Optional["Hallway"]]:
-
-        import tqdm
-
-        states_to_do: queue.Queue[State] = queue.Queue()
-        states_to_do.put(init_state)
-
-        collected_hallways: Dict[int, Tuple[int, Dict[int, int]]] = {hash(init_state.hallway): (0, {})}
-
-        target_hash = None
-        origin_hash = hash(init_state)
-        target_hallway: Optional[Hallway] = None
-
-        while not states_to_do.empty():
-            state = states_to_do.get()
-            hallway_hash = hash(state.hallway)
-            if state.done():
-                target_hash = hallway_hash
-                target_hallway = state.hallway
-            for new_state_package in state.new_states():
-                new_state = new_state_package.creation_function(**new_state_package.data)
-                new_hallway_hash = hash(new_state.hallway)
-                if new_hallway_hash not in collected_hallways:
-                    collected_hallways[new_hallway_hash] = (len(collected_hallways), {})
-                    states_to_do.put(new_state)
-                else:
-                    pass
-                collected_hallways[hallway_hash][1][collected_hallways[new_hallway_hash][0]] = new_state.energy
-
-        max_id = max(x[0] for x in collected_hallways.values())
-        graph = lil_matrix((max_id + 1, max_id + 1), dtype=int)
-        for from_tos in collected_hallways.values():
-            from_id, tos = from_tos
-            for to_id, weight in tos.items():
-                graph[from_id, to_id] = weight
-        origin_id = collected_hallways[origin_hash][0]
-        target_id = collected_hallways[target_hash][0]
-        dist_matrix = dijkstra(csgraph=graph, directed=True, indices=origin_id, return_predecessors=False, min_only=True)
-        return int(dist_matrix[target_id]), target_hallway
-
-    def __init__(self, hallway: Hallway, energy: int = 0):
+    def __init__(self, hallway: Hallway):
         self.hallway = hallway
-        self.id = self.__class__._COUNTER
-        self.__class__._COUNTER += 1
-        self.energy = energy
-
-    def new_states(self) -> List["StateCreationPackage"]:
-        ret: List[StateCreationPackage] = []
-
-        hallway_candidates: List[Tuple[int, HallwayTile]] = [(i, x) for i, x in enumerate(self.hallway) if
-                                                             not x.is_free()]
-        for idx, candidate in hallway_candidates:
-            potential_targets = self.hallway.get_rooms()
-            element = candidate.get(remove=False)
-            potential_targets = [(tile, room) for tile, room in potential_targets if tile.is_free()]
-            potential_targets = [(tile, room) for tile, room in potential_targets if
-                                 self.hallway.can_reach(candidate, tile)]
-            potential_targets = [(tile, room) for tile, room in potential_targets if room.accept(new_member=element)]
-            for target_tile, target_room in potential_targets:
-                new_energy = (self.hallway.cost(candidate, target_tile) + target_room.place_cost())
-                new_energy *= element.typ.get_cost()
-                data = {"origin_idx": idx,
-                        "target_idx": self.hallway.get_tile_idx(target_tile),
-                        "hallway": self.hallway,
-                        "energy": new_energy}
-                ret.append(StateCreationPackage(new_energy, self.create_state_hallway, data))
-            # return ret
-
-        room_candidates = [(tile, room) for tile, room in self.hallway.get_rooms() if tile.is_free()]
-        room_candidates = [(tile, room) for tile, room in room_candidates if room.get(remove=False) is not None]
-        for tile, room in room_candidates:
-            potential_targets = [(i, t) for i, t in enumerate(self.hallway) if t.is_free()]
-            potential_targets = [(i, t) for i, t in potential_targets if self.hallway.can_reach(tile, t)]
-            potential_targets = [(i, t) for i, t in potential_targets if t.get_room() is None]
-            tile_idx = self.hallway.get_tile_idx(tile)
-            el_cost, el = room.get(remove=False)
-            for target_idx, target_tile in potential_targets:
-                new_energy = (self.hallway.cost(tile, target_tile) + el_cost) * el.typ.get_cost()
-                data = {"origin_idx": tile_idx,
-                        "target_idx": target_idx,
-                        "hallway": self.hallway,
-                        "energy": new_energy}
-                ret.append(StateCreationPackage(new_energy, self.create_state_room, data))
-            # return [ret[0]]
-
+        self.size = len(hallway)
+        rooms = hallway.get_rooms()
+        self.doors: List[int] = [hallway.get_tile_idx(tile) for tile, _ in rooms]
+        self.room_types: List[int] = [room.occupant.get_room_idx() for _, room in rooms]
+        self.room_of_type: Dict[int, int] = {t: r for r, t in enumerate(self.room_types)}
+        self.depths: List[int] = [len(room) for _, room in rooms]
+        self.offsets: List[int] = [self.size + sum(self.depths[:r]) for r in range(len(rooms))]
+        self.costs: Dict[int, int] = {t.get_room_idx(): t.get_cost() for t in AmphipodTypes}
+        # Amphipods never stop in front of a room
+        self.stops: List[int] = [i for i in range(self.size) if i not in self.doors]
+        # Hallway tiles that have to be free to walk from door to tile, the tile itself excluded
+        self.between: List[List[Tuple[int, ...]]] = [
+            [tuple(range(min(d, t) + 1, max(d, t))) for t in range(self.size)] for d in self.doors
+        ]
+
+    def encode(self, hallway: Hallway) -> Tuple[int, ...]:
+        ret = [self.EMPTY if tile.is_free() else tile.get().typ.get_room_idx() for tile in hallway]
+        for _, room in hallway.get_rooms():
+            ret.extend(self.EMPTY if x is None else x.typ.get_room_idx() for x in room.spaces)
+        return tuple(ret)
+
+    def decode(self, state: Tuple[int, ...]) -> Hallway:
+        types = {t.get_room_idx(): t for t in AmphipodTypes}
+        ret = copy.copy(self.hallway)
+        for i, tile in enumerate(ret):
+            tile.get(remove=True)
+            if state[i] != self.EMPTY:
+                tile.set(new_element=Amphipod(typ=types[state[i]]))
+        for r, (_, room) in enumerate(ret.get_rooms()):
+            for k in range(len(room)):
+                v = state[self.offsets[r] + k]
+                room.spaces[k] = None if v == self.EMPTY else Amphipod(typ=types[v])
         return ret
 
-    @staticmethod
-    def create_state_hallway(origin_idx: int, target_idx: int, hallway: Hallway, energy: int) -> "State":
-        new_hallway = copy.copy(hallway)
-        move_element = new_hallway[origin_idx].get(remove=True)
-        new_room = new_hallway[target_idx].get_room()
-        new_room.place(move_element)
-        return State(hallway=new_hallway, energy=energy)
-
-    @staticmethod
-    def create_state_room(origin_idx: int, target_idx: int, hallway: Hallway, energy: int) -> "State":
-        new_hallway = copy.copy(hallway)
-        _, move_element = new_hallway[origin_idx].get_room().get(remove=True)
-        new_tile = new_hallway[target_idx]
-        new_tile.set(new_element=move_element)
-        return State(hallway=new_hallway, energy=energy)
-
-    def done(self) -> bool:
-        return self.hallway.done()
-
-    def __str__(self):
-        return f"State:  {self.id:6d}\nEnergy: {self.energy:6d}\n{self.hallway}"
-
-    def __lt__(self, other):
-        if not isinstance(other, State):
-            return True
-        return self.energy < other.energy
-
-    def __le__(self, other):
-        if not isinstance(other, State):
-            return True
-        return self.energy <= other.energy
-
-    def __gt__(self, other):
-        if not isinstance(other, State):
-            return True
-        return self.energy > other.energy
-
-    def __ge__(self, other):
-        if not isinstance(other, State):
-            return True
-        return self.energy >= other.energy
-
-    def __eq__(self, other):
-        if not isinstance(other, State):
-            return True
-        return self.id == other.id and self.energy == other.energy
-
-    def __ne__(self, other):
-        if not isinstance(other, State):
-            return True
-        return not self == other
-
-    def __hash__(self):
-        return hash(self.hallway)
-
+    def _room(self, state: Tuple[int, ...], r: int) -> Tuple[int, ...]:
+        return state[self.offsets[r]:self.offsets[r] + self.depths[r]]
+
+    def _happy(self, room: Tuple[int, ...], r: int) -> bool:
+        return all(x == self.EMPTY or x == self.room_types[r] for x in room)
+
+    def goal(self) -> Tuple[int, ...]:
+        ret = [self.EMPTY] * self.size
+        for r, depth in enumerate(self.depths):
+            ret.extend([self.room_types[r]] * depth)
+        return tuple(ret)
+
+    def moves(self, state: Tuple[int, ...]) -> Iterable[Tuple[int, Tuple[int, ...]]]:
+        """
+        Energy and resulting state of every move: from the hallway into the own room once it only holds its own
+        kind, or from the top of a room holding strangers to a free hallway tile.
+        Going home costs the same whenever it happens and only frees the way, so if it is possible it is the only move
+        """
+        for tile in range(self.size):
+            amp = state[tile]
+            if amp == self.EMPTY:
+                continue
+            r = self.room_of_type[amp]
+            room = self._room(state=state, r=r)
+            if room[0] != self.EMPTY or not self._happy(room=room, r=r):
+                continue
+            if any(state[i] != self.EMPTY for i in self.between[r][tile]):
+                continue
+            k = room.count(self.EMPTY) - 1
+            new_state = list(state)
+            new_state[tile] = self.EMPTY
+            new_state[self.offsets[r] + k] = amp
+            yield (abs(self.doors[r] - tile) + k + 1) * self.costs[amp], tuple(new_state)
+            return
+
+        for r in range(len(self.doors)):
+            room = self._room(state=state, r=r)
+            if self._happy(room=room, r=r):
+                continue
+            k = room.count(self.EMPTY)
+            amp = room[k]
+            for tile in self.stops:
+                if state[tile] != self.EMPTY or any(state[i] != self.EMPTY for i in self.between[r][tile]):
+                    continue
+                new_state = list(state)
+                new_state[tile] = amp
+                new_state[self.offsets[r] + k] = self.EMPTY
+                yield (abs(self.doors[r] - tile) + k + 1) * self.costs[amp], tuple(new_state)
+
+    def heuristic(self, state: Tuple[int, ...]) -> int:
+        """
+        Energy to walk every amphipod that still has to move straight into its room, ignoring everyone in the way.
+        Amphipods entering the same room fill it from the bottom, one step less deep each
+        """
+        ret = 0
+        entering = [0] * len(self.doors)
+        for tile in range(self.size):
+            amp = state[tile]
+            if amp != self.EMPTY:
+                r = self.room_of_type[amp]
+                ret += (abs(self.doors[r] - tile) + 1) * self.costs[amp]
+                entering[r] += 1
+        for r in range(len(self.doors)):
+            room = self._room(state=state, r=r)
+            for k, amp in enumerate(room):
+                if amp == self.EMPTY or (amp == self.room_types[r] and self._happy(room=room[k:], r=r)):
+                    continue
+                target = self.room_of_type[amp]
+                # Leaving the own room needs at least one step aside and back
+                ret += (k + 1 + max(abs(self.doors[target] - self.doors[r]), 2) + 1) * self.costs[amp]
+                entering[target] += 1
+        for r, n in enumerate(entering):
+            ret += n * (n - 1) // 2 * self.costs[self.room_types[r]]
+        return ret
 
-@dataclass(order=True)
-class StateCreationPackage:
-    energy: int
-    creation_function: Callable[[int, int, Hallway, int], "State"] = field(compare=False)
-    data: Dict[str, Any] = field(compare=False)
+    def solve(self, start: Optional[Tuple[int, ...]] = None) -> Tuple[Optional[int], Optional[Tuple[int, ...]]]:
+        """
+        Least energy to sort all amphipods into their rooms, found with A* and stopped as soon as it is reached
+        """
+        start = self.encode(self.hallway) if start is None else start
+        goal = self.goal()
+        best: Dict[Tuple[int, ...], int] = {start: 0}
+        todo: List[Tuple[int, int, Tuple[int, ...]]] = [(self.heuristic(start), 0, start)]
+        while len(todo) > 0:
+            _, energy, state = heapq.heappop(todo)
+            if state == goal:
+                return energy, state
+            if energy > best[state]:
+                continue
+            for cost, new_state in self.moves(state=state):
+                new_energy = energy + cost
+                if new_energy < best.get(new_state, new_energy + 1):
+                    best[new_state] = new_energy
+                    heapq.heappush(todo, (new_energy + self.heuristic(new_state), new_energy, new_state))
+        return None, None
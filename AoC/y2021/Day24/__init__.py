@@ -10,10 +10,6 @@ from functools import lru_cache
 from collections import Counter
 
 import numpy as np
-from scipy.spatial import distance
-from scipy.signal import convolve2d
-import matplotlib
-import matplotlib.pyplot as plt
 
 from AoC_Companion.Day import Task
 from AoC_Companion.test import TestData
@@ -30,14 +26,15 @@ def pre_process_input(data: Any) -> Any:
     return ret
 
 
-# @Task(year=2021, day=24, task=1)
+@Task(year=2021, day=24, task=1)
 def run_t1(data: List[str], log: Callable[[str], None]) -> Any:
     monad = MONAD(instruction_lines=data)
-    valid_numbers = monad.find_valid_numbers()
-    # biggest_num = monad.force_biggest_number()
-    return valid_numbers[0], valid_numbers[-1]
+    lowest, highest = monad.find_valid_number_range()
+    return highest
 
 
-# @Task(year=2021, day=24, task=2)
-def run_t2(data: Any, log: Callable[[str], None]) -> Any:
-    return None
+@Task(year=2021, day=24, task=2)
+def run_t2(data: List[str], log: Callable[[str], None]) -> Any:
+    monad = MONAD(instruction_lines=data)
+    lowest, highest = monad.find_valid_number_range()
+    return lowest
@@ -1,4 +1,5 @@
-from typing import Dict, Callable, Tuple, Union, Iterator, List, Type
+from typing import Dict, Callable, Tuple, Union, Iterator, List, Type, Optional
+import functools
 from abc import ABC, abstractmethod
 import math
 from enum import Enum
@@ -89,6 +90,76 @@ class ALUInstructionList:
     def __getitem__(self, item):
         return self._instructions[item]
 
+    def input_blocks(self) -> List[Tuple[int, int]]:
+        """
+        (start, stop) of the instruction ranges that begin with an input, preceded by the instructions before the
+        first input if there are any
+        """
+        starts = [i for i, inst in enumerate(self._instructions) if inst.operation_isinstance(Inp)]
+        if len(starts) <= 0 or starts[0] != 0:
+            starts.insert(0, 0)
+        return list(zip(starts, starts[1:] + [len(self)]))
+
+    def live_registers(self, start: int = 0) -> List[int]:
+        """
+        Registers whose value at instruction start can still influence the result. All others are written
+        before they are read again, so states only differing in them behave the same from there on
+        """
+        live, written = set(), set()
+        for instruction in self._instructions[start:]:
+            live.update(r for r in instruction.reads() if r not in written)
+            written.add(instruction.target)
+        return sorted(live.union(set(range(self.get_suggested_register_size())).difference(written)))
+
+    def compile(self, start: int = 0, stop: int = None, outputs: List[int] = None,
+                memoize: bool = False) -> Callable:
+        """
+        Turns the instructions start to stop into straight-line python code over local variables.
+        The function takes the registers the instructions read before writing them (and the outputs they do not
+        write), ordered by register index, followed by the input value if the range contains an input. It returns
+        the output registers, by default all registers still live after stop, as a tuple or a single value.
+        Only plain arithmetic is generated, so the function works on ints as well as on numpy arrays
+        """
+        stop = len(self) if stop is None else stop
+        outputs = self.live_registers(stop) if outputs is None else outputs
+        arguments, written = set(), set()
+        namespace: Dict[str, object] = {}
+        lines = []
+        has_input = False
+        for i, instruction in enumerate(self._instructions[start:stop]):
+            if instruction.operation_isinstance(Inp):
+                if has_input:
+                    raise ValueError("Only instruction ranges with at most one input can be compiled")
+                has_input = True
+            arguments.update(r for r in instruction.reads() if r not in written)
+            written.add(instruction.target)
+            lines.append(f"    r{instruction.target} = {instruction.source(namespace, f'_op{i}')}")
+        arguments.update(r for r in outputs if r not in written)
+        parameters = [f"r{r}" for r in sorted(arguments)] + (["inp"] if has_input else [])
+        returned = ", ".join(f"r{r}" for r in outputs) if len(outputs) > 0 else "None"
+        source = "\n".join([f"def _compiled({', '.join(parameters)}):"] + lines + [f"    return {returned}"])
+        exec(compile(source, f"<ALU instructions {start}-{stop}>", "exec"), namespace)
+        ret = namespace["_compiled"]
+        ret.__doc__ = source
+        return functools.lru_cache(maxsize=None)(ret) if memoize else ret
+
+    def compile_blocks(self, outputs: List[int] = None, memoize: bool = False) -> List[Callable]:
+        """
+        One compiled function per input block, see input_blocks and compile
+        """
+        return [self.compile(start=start, stop=stop, outputs=outputs, memoize=memoize)
+                for start, stop in self.input_blocks()]
+
+    def forward_batch(self, registers: np.ndarray, inputs: np.ndarray = None, start: int = 0,
+                      stop: int = None) -> np.ndarray:
+        """
+        Runs the instructions start to stop on every row (one state each) of registers at once.
+        Instructions may contain at most one input, which reads inputs (one value per row)
+        """
+        for instruction in self._instructions[start:stop]:
+            instruction.forward_batch(registers=registers, inputs=inputs)
+        return registers
+
 
 class ALUInstruction:
 
@@ -105,9 +176,55 @@ class ALUInstruction:
         register[self._data[0][0]] = res
         return register
 
+    def forward_batch(self, registers: np.ndarray, inputs: np.ndarray = None) -> np.ndarray:
+        if self.operation_isinstance(Inp):
+            if inputs is None:
+                raise ValueError("Running an input instruction on a batch needs inputs")
+            registers[:, self.target] = inputs
+            return registers
+        res = self._op.forward_batch(*[registers[:, x] if t == ValueType.Register else x for x, t in self._data])
+        registers[:, self.target] = res
+        return registers
+
     def __call__(self, register: np.ndarray) -> np.ndarray:
         return self.forward(register=register)
 
+    @property
+    def target(self) -> int:
+        return self._data[0][0]
+
+    def source(self, namespace: Dict[str, object], name: str) -> str:
+        """
+        Python expression computing this instruction from the local variables r<register> and inp.
+        Operations without a source expression of their own are called through namespace[name]
+        """
+        if self.operation_isinstance(Inp):
+            return "inp"
+        if self.operation_isinstance(Mul) and 0 in self.constants():
+            return "0"
+        values = [f"r{x}" if t == ValueType.Register else repr(x) for x, t in self._data]
+        ret = self._op.source(*values)
+        if ret is None:
+            namespace[name] = self._op
+            ret = f"{name}({', '.join(values)})"
+        return ret
+
+    def operands(self) -> List[int]:
+        return [x for x, _ in self._data]
+
+    def constants(self) -> List[int]:
+        return [x for x, t in self._data if t == ValueType.Constant]
+
+    def is_constant(self) -> List[bool]:
+        return [t == ValueType.Constant for _, t in self._data]
+
+    def reads(self) -> List[int]:
+        if self.operation_isinstance(Inp):
+            return []
+        if self.operation_isinstance(Mul) and any(t == ValueType.Constant and x == 0 for x, t in self._data):
+            return []
+        return [x for x, t in self._data if t == ValueType.Register]
+
     def operation_isinstance(self, typ: Type):
         return isinstance(self._op, typ)
 
@@ -124,6 +241,12 @@ class ALUOperation(ABC):
     def forward(self, *values: int) -> int:
         pass
 
+    def forward_batch(self, *values: Union[np.ndarray, int]) -> np.ndarray:
+        return np.vectorize(self.forward, otypes=[np.int64])(*values)
+
+    def source(self, *operands: str) -> Optional[str]:
+        return None
+
     def __call__(self, *args):
         return self.forward(*args)
 
@@ -135,11 +258,23 @@ class Add(ALUOperation):
     def forward(self, *values: int) -> int:
         return int(sum(values))
 
+    def forward_batch(self, *values: Union[np.ndarray, int]) -> np.ndarray:
+        return sum(values[1:], values[0])
+
+    def source(self, *operands: str) -> Optional[str]:
+        return " + ".join(operands)
+
 
 class Mul(ALUOperation):
     def forward(self, *values: int) -> int:
         return int(math.prod(values))
 
+    def forward_batch(self, *values: Union[np.ndarray, int]) -> np.ndarray:
+        return math.prod(values[1:], start=values[0])
+
+    def source(self, *operands: str) -> Optional[str]:
+        return " * ".join(operands)
+
 
 class Div(ALUOperation):
     def forward(self, *values: int) -> int:
@@ -147,6 +282,14 @@ class Div(ALUOperation):
             raise Exception(f"You can only divide 2 values. {len(values)} given")
         return values[0] // values[1]
 
+    def forward_batch(self, *values: Union[np.ndarray, int]) -> np.ndarray:
+        if len(values) != 2:
+            raise Exception(f"You can only divide 2 values. {len(values)} given")
+        return np.floor_divide(values[0], values[1])
+
+    def source(self, *operands: str) -> Optional[str]:
+        return f"{operands[0]} // {operands[1]}" if len(operands) == 2 else None
+
 
 class Mod(ALUOperation):
     def forward(self, *values: int) -> int:
@@ -154,6 +297,14 @@ class Mod(ALUOperation):
             raise Exception(f"You can only take modulo 2 values. {len(values)} given")
         return values[0] % values[1]
 
+    def forward_batch(self, *values: Union[np.ndarray, int]) -> np.ndarray:
+        if len(values) != 2:
+            raise Exception(f"You can only take modulo 2 values. {len(values)} given")
+        return np.mod(values[0], values[1])
+
+    def source(self, *operands: str) -> Optional[str]:
+        return f"{operands[0]} % {operands[1]}" if len(operands) == 2 else None
+
 
 class Eql(ALUOperation):
     def forward(self, *values: int) -> int:
@@ -161,6 +312,18 @@ class Eql(ALUOperation):
             return True
         return int(all(x == values[0] for x in values[1:]))
 
+    def forward_batch(self, *values: Union[np.ndarray, int]) -> np.ndarray:
+        ret = np.ones_like(values[0], dtype=np.int64)
+        for x in values[1:]:
+            ret &= values[0] == x
+        return ret
+
+    def source(self, *operands: str) -> Optional[str]:
+        if len(operands) != 2:
+            return None
+        # Multiplying keeps it an int for ints and an int array for arrays
+        return f"({operands[0]} == {operands[1]}) * 1"
+
 
 class Inp(ALUOperation):
     def __init__(self):
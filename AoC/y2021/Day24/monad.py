@@ -1,10 +1,12 @@
-from typing import List, Dict, Tuple, Iterable
-from copy import deepcopy
-import queue
+from typing import Callable, List, Tuple, Iterable, Optional, Set
+import math
+import sys
 
 import numpy as np
 
-from .alu import ALU, ALUInstructionList, ALUInstruction, Inp
+from .alu import ALUInstructionList, ALUInstruction, Inp, Add, Mul, Div, Mod, Eql
+
+Interval = Tuple[float, float]
 
 
 class MONAD:
@@ -12,6 +14,7 @@ class MONAD:
     def __init__(self, instruction_lines: List[str], number_len: int = 14):
         self._instructions = ALUInstructionList(*instruction_lines)
         self._number_len = number_len
+        self._compiled: Optional[List[Callable[[int, int], int]]] = None
         c = 0
         for instruction in self._instructions:
             if instruction.operation_isinstance(Inp):
@@ -20,80 +23,186 @@ class MONAD:
             raise ValueError(f"The amount of inputs in your instructions dont match the wanted length of model number. "
                              f"{c} != {self._number_len}")
 
-    def force_biggest_number(self):
-        from tqdm import tqdm
-
-        def iter_numbs(_number_len: int) -> Iterable[List[int]]:
-            if _number_len <= 0:
-                yield []
-            else:
-                for i in range(9, 0, -1):
-                    j = [i]
-                    for other in iter_numbs(_number_len=_number_len - 1):
-                        yield j + other
-
-        with tqdm(desc=f"Iterating potential numbers", leave=False, total=9**14) as pb:
-            for x in iter_numbs(_number_len=self._number_len):
-
-                pb.update()
-
-    def find_valid_numbers(self) -> List[int]:
-        from tqdm import tqdm
-
-        states: Dict[int, Tuple[np.ndarray, List[int]]] = {
-            0: (np.zeros(self._instructions.get_suggested_register_size(), dtype=int), [0])
-        }
-        # states.put((np.zeros(4, dtype=int), []))
-
-        iterative_memory = [0]
-
-        def memory() -> int:
-            ret = iterative_memory[0] + 1
-            iterative_memory[0] = (iterative_memory[0] + 1) % 10
-            return ret
-
-        self._instructions.get_alu_core().bind_input_memory(memory_retriever=memory)
-
-        # print("\n".join(str(x) for x in self._instructions))
-        # print(", ".join(f"{k}: {self._instructions.get_register_idx(k)}" for k in ["w", "x", "y", "z"]))
-        # exit()
-        inps = 0
-        with tqdm(desc=f"States: {len(states)}, Inputs: {inps}/{self._number_len}", leave=False, total=len(self._instructions)) as pb:
-            for instruction in self._instructions:
-                pb.update()
-                instruction: ALUInstruction
-                new_states: Dict[int, Tuple[np.ndarray, List[int]]] = {}
-                if instruction.operation_isinstance(Inp):
-                    inps += 1
-                    for register, model_num in states.values():
-                        for i in range(1, 10):
-                            new_register = register.copy()
-                            # self._alu_core.bind_input_memory(lambda: i)
-                            instruction(new_register)
-                            new_nums = []
-                            for num in model_num:
-                                new_nums.append(num * 10 + i)
-                            h = hash(new_register.tostring())
-                            if h not in new_states:
-                                new_states[h] = (new_register, [])
-                            new_states[h][1].extend(new_nums)
-                else:
-                    for register, model_num in states.values():
-                        instruction(register)
-                        h = hash(register.tostring())
-                        if h not in new_states:
-                            new_states[h] = (register, [])
-                        new_states[h][1].extend(model_num)
-                states = new_states
-                pb.set_description(desc=f"States: {len(states)}, Inputs: {inps}/{self._number_len}")
-
-        valid_model_numbers: List[int] = []
+    def compiled_blocks(self) -> List[Callable[[int, int], int]]:
+        """
+        Every input block as a compiled (z, w) -> z function
+        """
+        if self._compiled is None:
+            z_id = self._instructions.get_register_idx("z")
+            blocks = self._instructions.compile_blocks(outputs=[z_id])
+            for block in blocks:
+                if block.__code__.co_varnames[:block.__code__.co_argcount] != (f"r{z_id}", "inp"):
+                    raise ValueError(f"Block does not only depend on z and its input:\n{block.__doc__}")
+            self._compiled = blocks
+        return self._compiled
+
+    def check(self, number: int) -> bool:
+        digits = [int(x) for x in str(number)]
+        if len(digits) != self._number_len or 0 in digits:
+            return False
+        z = 0
+        for block, w in zip(self.compiled_blocks(), digits):
+            z = block(z, w)
+        return z == 0
+
+    def _force(self, digits: Iterable[int]) -> Optional[int]:
+        """
+        Depth first search over the digits in the given order, the first valid number found is returned.
+        (block, z) pairs that lead nowhere are remembered, so every state is expanded only once.
+        States that can not get back to z == 0 are cut off as in find_valid_number_range
+        """
+        blocks = self.compiled_blocks()
+        z_limits = self._z_limits(self._instructions.input_blocks()) or [sys.maxsize] * len(blocks)
+        digits = list(digits)
+        dead: Set[Tuple[int, int]] = set()
+        stack: List[Tuple[int, int, int, int]] = [(0, 0, 0, 0)]
+        while len(stack) > 0:
+            block_id, z, number, digit_id = stack.pop()
+            if block_id == len(blocks):
+                if z == 0:
+                    return number
+                continue
+            if digit_id >= len(digits) or z >= z_limits[block_id]:
+                dead.add((block_id, z))
+                continue
+            stack.append((block_id, z, number, digit_id + 1))
+            new_z = blocks[block_id](z, digits[digit_id])
+            if (block_id + 1, new_z) not in dead:
+                stack.append((block_id + 1, new_z, number * 10 + digits[digit_id], 0))
+        return None
+
+    def force_biggest_number(self) -> Optional[int]:
+        return self._force(range(9, 0, -1))
+
+    def force_smallest_number(self) -> Optional[int]:
+        return self._force(range(1, 10))
+
+    def _z_limits(self, blocks: List[Tuple[int, int]]) -> Optional[List[int]]:
+        """
+        In MONAD z only ever gets divided by a positive constant, multiplied with a y of at least 1 or a y of at least
+        0 added to it. Then z never becomes negative and only the divisions make it smaller, so a state whose z is at
+        least the product of all remaining divisors can not reach z == 0 anymore.
+        The value range of every register is followed through the program to check this, for programs that change
+        z any other way no limits are known
+        """
         z_id = self._instructions.get_register_idx("z")
-        for register, model_num in states.values():
-            register: np.ndarray
-            if register[z_id] == 0:
-                valid_model_numbers.extend(model_num)
-
-        self._instructions.get_alu_core().reset()
-
-        return sorted(valid_model_numbers)
+        bounds: List[Interval] = [(0, 0)] * self._instructions.get_suggested_register_size()
+        divisors = []
+        for start, stop in blocks:
+            divisor = 1
+            for instruction in self._instructions[start:stop]:
+                if instruction.target == z_id:
+                    values = _operand_bounds(instruction, bounds)
+                    if instruction.operation_isinstance(Div) and instruction.is_constant() == [False, True] and \
+                            values[1][0] > 0:
+                        divisor *= values[1][0]
+                    elif len(values) != 2:
+                        return None
+                    elif not (instruction.operation_isinstance(Add) and values[1][0] >= 0 or
+                              instruction.operation_isinstance(Mul) and values[1][0] >= 1):
+                        return None
+                bounds[instruction.target] = _bounds(instruction, bounds)
+            divisors.append(divisor)
+        return [math.prod(divisors[i:]) for i in range(len(divisors))]
+
+    def find_valid_number_range(self) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Smallest and biggest valid model number, None if there is none.
+        All states are run as rows of one register matrix. Before every input states that agree in all live
+        registers are merged, each keeping only the smallest and biggest model number leading to it.
+        The blocks run compiled on whole columns if they allow it, otherwise instruction by instruction
+        """
+        blocks = self._instructions.input_blocks()
+        z_limits = self._z_limits(blocks)
+        z_id = self._instructions.get_register_idx("z")
+        digits = np.arange(1, 10, dtype=np.int64)
+        try:
+            # Only z is carried between compiled blocks, the other registers are dead at every input anyway
+            compiled = self.compiled_blocks()
+        except ValueError:
+            compiled = None
+
+        registers = np.zeros((1, self._instructions.get_suggested_register_size()), dtype=np.int64)
+        lowest, highest = np.zeros(1, dtype=np.int64), np.zeros(1, dtype=np.int64)
+        for block_id, (start, stop) in enumerate(blocks):
+            if not self._instructions[start].operation_isinstance(Inp):
+                self._instructions.forward_batch(registers, start=start, stop=stop)
+                continue
+            if z_limits is not None:
+                keep = registers[:, z_id] < z_limits[block_id]
+                registers, lowest, highest = registers[keep], lowest[keep], highest[keep]
+            live = self._instructions.live_registers(start)
+            if len(live) == 1:
+                # Sorting a single column is a lot faster than sorting rows
+                values, inverse = np.unique(registers[:, live[0]], return_inverse=True)
+                registers = np.zeros((len(values), registers.shape[1]), dtype=np.int64)
+                registers[:, live[0]] = values
+            else:
+                dead = [r for r in range(registers.shape[1]) if r not in live]
+                registers[:, dead] = 0
+                registers, inverse = np.unique(registers, axis=0, return_inverse=True)
+            inverse = inverse.reshape(-1)
+            new_lowest = np.full(registers.shape[0], np.iinfo(np.int64).max, dtype=np.int64)
+            new_highest = np.full(registers.shape[0], -1, dtype=np.int64)
+            np.minimum.at(new_lowest, inverse, lowest)
+            np.maximum.at(new_highest, inverse, highest)
+
+            registers = np.repeat(registers, len(digits), axis=0)
+            inputs = np.tile(digits, len(new_lowest))
+            lowest = np.repeat(new_lowest, len(digits)) * 10 + inputs
+            highest = np.repeat(new_highest, len(digits)) * 10 + inputs
+            if compiled is not None:
+                registers[:, z_id] = compiled[block_id](registers[:, z_id], inputs)
+            else:
+                self._instructions.forward_batch(registers, inputs=inputs, start=start, stop=stop)
+
+        valid = registers[:, z_id] == 0
+        if not np.any(valid):
+            return None, None
+        return int(lowest[valid].min()), int(highest[valid].max())
+
+
+def _mul(a: float, b: float) -> float:
+    return 0 if a == 0 or b == 0 else a * b
+
+
+def _div(a: float, b: int) -> float:
+    return a // b if math.isfinite(a) else a * (1 if b > 0 else -1)
+
+
+def _operand_bounds(instruction: ALUInstruction, bounds: List[Interval]) -> List[Interval]:
+    return [(x, x) if constant else bounds[x] for x, constant in zip(instruction.operands(), instruction.is_constant())]
+
+
+def _bounds(instruction: ALUInstruction, bounds: List[Interval]) -> Interval:
+    """
+    Range of values the instruction can write if every register read lies in its range in bounds
+    """
+    if instruction.operation_isinstance(Inp):
+        return 1, 9
+    if instruction.operation_isinstance(Mul) and 0 in instruction.constants():
+        return 0, 0
+    values = _operand_bounds(instruction, bounds)
+    if instruction.operation_isinstance(Add):
+        return sum(v[0] for v in values), sum(v[1] for v in values)
+    if instruction.operation_isinstance(Mul):
+        ret = values[0]
+        for value in values[1:]:
+            products = [_mul(a, b) for a in ret for b in value]
+            ret = min(products), max(products)
+        return ret
+    if instruction.operation_isinstance(Eql):
+        if all(v[0] == v[1] == values[0][0] for v in values):
+            return 1, 1
+        return 0, 1
+    if len(values) == 2 and values[1][0] == values[1][1] != 0:
+        low, high = values[0]
+        divisor = values[1][0]
+        if instruction.operation_isinstance(Div):
+            low, high = _div(low, divisor), _div(high, divisor)
+            return min(low, high), max(low, high)
+        if instruction.operation_isinstance(Mod):
+            if divisor > 0:
+                return (low, high) if 0 <= low and high < divisor else (0, divisor - 1)
+            return (low, high) if divisor < low and high <= 0 else (divisor + 1, 0)
+    return -math.inf, math.inf
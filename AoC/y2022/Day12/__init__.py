@@ -1,12 +1,12 @@
 import os
 from time import perf_counter
-from typing import Callable, AnyStr, Tuple, List, Union
+from typing import Callable, AnyStr, Tuple, List, Iterator
 
 import numpy as np
 from AoC_Companion.Day import Task
 from AoC_Companion.Preprocess import Preprocessor
-from scipy.sparse import coo_matrix as sparse_matrix
-from scipy.sparse.csgraph import shortest_path
+
+from ...pathfinding import bfs, grid_neighbours
 
 
 @Preprocessor(year=2022, day=12)
@@ -39,25 +39,19 @@ def task01(data: Tuple[np.ndarray, Tuple[int, int], Tuple[int, int]], log: Calla
     height_map, start, end = data
     log(f"Map-size: {height_map.shape[1]}x{height_map.shape[0]}; start: {start}; end: {end}")
 
-    prepared_map = _prepare_map(height_map=height_map)
-    log(" -> Prepared map for routing")
-
     t1 = perf_counter()
-    dist_matrix, predecessors = shortest_path(
-        prepared_map, directed=True, return_predecessors=True, indices=_create_idx(height_map, start)
+    result = bfs(
+        sources=_create_idx(height_map, start), neighbours=_potential_steps(height_map=height_map),
+        size=height_map.size, targets=[_create_idx(height_map, end)],
     )
     t2 = perf_counter()
     log(f" -> Route planned. Took {t2 - t1}s")
-    ret = int(dist_matrix[_create_idx(height_map, end)])
+    ret = int(result[_create_idx(height_map, end)])
     log(f"Fastest route to get from {start} to {end} is {ret} steps long")
 
     if draw:
-        fig, _ = _create_map_image(
-            height_map=height_map, predecessors=predecessors, start=_create_idx(height_map, start),
-            end=_create_idx(height_map, end)
-        )
+        fig, _ = _create_map_image(height_map=height_map, route=result.path())
         fig.savefig(os.path.join(os.path.dirname(__file__), f"p1.png"), dpi=600)
-
     return ret
 
 
@@ -69,55 +63,26 @@ def task02(data: Tuple[np.ndarray, Tuple[int, int], Tuple[int, int]], log: Calla
     start_point_idx: List[int] = [_create_idx(height_map, x) for x in start_points]
     log(f"Now considering {len(start_point_idx)} starting points")
 
-    prepared_map = _prepare_map(height_map=height_map)
-    log(" -> Prepared map for routing")
-
     t1 = perf_counter()
-    # noinspection PyTypeChecker
-    dist_matrix, predecessors = shortest_path(
-        prepared_map, directed=True, return_predecessors=True, indices=start_point_idx, unweighted=True,
+    result = bfs(
+        sources=start_point_idx, neighbours=_potential_steps(height_map=height_map), size=height_map.size,
+        targets=[_create_idx(height_map, end)],
     )
     t2 = perf_counter()
     log(f" -> Route planned. Took {t2 - t1}s")
 
-    ret = int(np.min(dist_matrix[:, _create_idx(height_map, end)]))
-    best_route = np.where(dist_matrix[:, _create_idx(height_map, end)] == ret)[0][0]
-    start = start_points[best_route]
+    ret = int(result[_create_idx(height_map, end)])
+    route = result.path()
+    start = _create_pt(height_map, route[0])
     log(f"Fastest route to get to {end} starts at {start} and takes {ret} steps")
 
     if draw:
-        predecessors = predecessors[best_route] if len(start_point_idx) > 0 else predecessors
-        fig, _ = _create_map_image(
-            height_map=height_map, predecessors=predecessors, start=_create_idx(height_map, start),
-            end=_create_idx(height_map, end)
-        )
+        fig, _ = _create_map_image(height_map=height_map, route=route)
         fig.savefig(os.path.join(os.path.dirname(__file__), f"p2.png"), dpi=600)
 
     return ret
 
 
-def _prepare_map(height_map: np.ndarray) -> Union[sparse_matrix, np.ndarray]:
-    points = height_map.shape[0] * height_map.shape[1]
-    min_pt = (0, 0)
-    max_pt = (height_map.shape[0] - 1, height_map.shape[1] - 1)
-    ret = np.zeros((points, points), dtype=int)
-    for i in range(height_map.shape[0]):
-        for j in range(height_map.shape[1]):
-            pt = _create_idx(height_map, (i, j))
-            current = (i, j)
-            pot_points = _potential_steps(curr=current, min_pt=min_pt, max_pt=max_pt)
-            for n in pot_points:
-                if height_map[n] - 1 == height_map[current]:
-                    ret[pt, _create_idx(height_map, n)] = 1
-                elif height_map[n] == height_map[current]:
-                    ret[pt, _create_idx(height_map, n)] = 1
-                elif height_map[n] < height_map[current]:
-                    ret[pt, _create_idx(height_map, n)] = 1
-                else:
-                    ret[pt, _create_idx(height_map, n)] = 0
-    return ret
-
-
 def _create_idx(height_map: np.ndarray, pt: Tuple[int, int]) -> int:
     return pt[0] * height_map.shape[1] + pt[1]
 
@@ -126,22 +91,21 @@ def _create_pt(height_map: np.ndarray, idx: int) -> Tuple[int, int]:
     return idx // height_map.shape[1], idx % height_map.shape[1]
 
 
-def _potential_steps(curr: Tuple[int, int], min_pt: Tuple[int, int], max_pt: Tuple[int, int]) -> List[Tuple[int, int]]:
-    ret = []
+def _potential_steps(height_map: np.ndarray) -> Callable[[int], Iterator[int]]:
+    # You can climb at most one step up but fall down as far as you want
+    heights = height_map.ravel().tolist()
+    grid_steps = grid_neighbours(height_map.shape)
 
-    if curr[0] > min_pt[0]:
-        ret.append((curr[0] - 1, curr[1]))
-    if curr[0] < max_pt[0]:
-        ret.append((curr[0] + 1, curr[1]))
-    if curr[1] > min_pt[1]:
-        ret.append((curr[0], curr[1] - 1))
-    if curr[1] < max_pt[1]:
-        ret.append((curr[0], curr[1] + 1))
+    def _steps(idx: int) -> Iterator[int]:
+        max_height = heights[idx] + 1
+        for n in grid_steps(idx):
+            if heights[n] <= max_height:
+                yield n
 
-    return ret
+    return _steps
 
 
-def _create_map_image(height_map: np.ndarray, predecessors: np.ndarray, start: int, end: int) -> Tuple["Figure", "Axes"]:
+def _create_map_image(height_map: np.ndarray, route: List[int]) -> Tuple["Figure", "Axes"]:
     import matplotlib.pyplot as plt
 
     fig, ax = plt.subplots()
@@ -149,22 +113,11 @@ def _create_map_image(height_map: np.ndarray, predecessors: np.ndarray, start: i
     ax: plt.Axes
     fig.set_size_inches(5, 5)
     ax.set_axis_off()
-    fig.suptitle(f"Your route from {_create_pt(height_map, start)[::-1]} to {_create_pt(height_map, end)[::-1]}")
+    fig.suptitle(f"Your route from {_create_pt(height_map, route[0])[::-1]} to {_create_pt(height_map, route[-1])[::-1]}")
 
-    img = np.zeros(height_map.shape, dtype=np.int64)
     img = height_map.copy()
-    current = end
-    i = 1
-
-    while current != start:
+    for current in route:
         img[_create_pt(height_map, current)] = np.max(height_map) * 1.5
-        current = predecessors[current]
-        i += 1
-        if current < 0:
-            raise Exception()
-    img[_create_pt(height_map, start)] = np.max(height_map) * 1.5
-    # img[img == 0] = -i
     ax.imshow(img)
 
     return fig, ax
-
@@ -8,13 +8,16 @@ from functools import lru_cache
 from copy import deepcopy
 from math import lcm, ceil
 
-from shapely import Polygon, Point
 from tqdm import tqdm
 import numpy as np
 from AoC_Companion.Day import Task
 from AoC_Companion.test import TestData
 from AoC_Companion.Preprocess import Preprocessor
 
+from ...lazy import lazy_import
+
+shapely = lazy_import("shapely")
+
 PIPES: Dict[str, List[Tuple[int, int]]] = {
     "|": [(1, 0), (-1, 0)],
     "-": [(0, 1), (0, -1)],
@@ -94,7 +97,7 @@ def task02(
             else:
                 raise Exception()
     loop = loop[:-1]
-    poly = Polygon(loop)
+    poly = shapely.Polygon(loop)
     t2 = perf_counter()
     log(f"Loop creation took {timedelta(seconds=t2 - t1)}")
     log(f"Loop has a length of {len(loop)}")
@@ -108,7 +111,7 @@ def task02(
             for j in range(x_bound[0], x_bound[1] + 1, 1):
                 p = (i, j)
                 if p not in loop:
-                    in_out[p] = poly.contains(Point(*p))
+                    in_out[p] = poly.contains(shapely.Point(*p))
                     pb.update(n=1)
     t2 = perf_counter()
     log(f"In/Out checking took {timedelta(seconds=t2 - t1)}")
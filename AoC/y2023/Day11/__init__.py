@@ -8,7 +8,6 @@ from functools import lru_cache
 from copy import deepcopy
 from math import lcm, ceil
 
-from shapely import Polygon, Point
 from tqdm import tqdm
 import numpy as np
 from AoC_Companion.Day import Task
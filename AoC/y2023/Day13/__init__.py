@@ -10,7 +10,6 @@ from copy import deepcopy
 from math import lcm, ceil
 import re
 
-from shapely import Polygon, Point
 from tqdm import tqdm
 import numpy as np
 from AoC_Companion.Day import Task
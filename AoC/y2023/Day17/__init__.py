@@ -1,7 +1,7 @@
 import sys
 import os.path
 from datetime import timedelta
-from typing import Callable, AnyStr, Optional, Dict, List, Tuple, Iterable, Generator, Iterator, Set, Deque
+from typing import Callable, AnyStr, Optional, List, Tuple, Iterable, Generator, Iterator, Set, Deque
 from collections import defaultdict, OrderedDict
 from time import perf_counter
 from itertools import chain
@@ -9,16 +9,14 @@ from functools import lru_cache
 from copy import deepcopy
 from math import lcm, ceil
 import re
-from queue import PriorityQueue
 
-from shapely import Polygon, Point
 from tqdm import tqdm
 import numpy as np
 from AoC_Companion.Day import Task
 from AoC_Companion.test import TestData
 from AoC_Companion.Preprocess import Preprocessor
 
-from ..Day16 import tpl_add
+from ...pathfinding import dijkstra
 
 # noinspection DuplicatedCode
 DAY = int(os.path.basename(os.path.dirname(__file__))[3:])
@@ -85,29 +83,29 @@ def check_out_bounds(tpl: Tuple[int, ...], area: Tuple[int, ...]):
 def path_search(
         city_map: np.ndarray, start: Tuple[int, int], end: Tuple[int, int], min_steps: int, max_steps: int,
 ) -> Tuple[int, List[Tuple[int, int]]]:
-
-    current: PriorityQueue[Tuple[int, int, Tuple[int, int], Tuple[int, int], List[Tuple[int, int]]]] = PriorityQueue()
-    current.put((0, 0, start, (0, 0), [start]))
-    visited: Dict[Tuple[Tuple[int, int], Tuple[int, int]], int] = {}
-    i = 0
-    while current:
-        i += 1
-        current_heat, _, current_position, current_direction, path = current.get()
-        if current_position == end:
-            return current_heat, path
-        if visited.get((current_position, current_direction), np.inf) <= current_heat:
-        # if (current_position, current_direction) in visited:
-            continue
-        visited[(current_position, current_direction)] = current_heat
-        for d in ((1, 0), (-1, 0), (0, 1), (0, -1)):
-            if d in (current_direction, tpl_mult(current_direction, -1)):
-                continue
-            new_position = current_position
-            new_heat = current_heat
+    # Nodes are (cell, axis of the last move). After moving along one axis the crucible has to turn,
+    # so every node only expands the moves along the other axis
+    h, w = city_map.shape
+    heat = city_map.ravel().tolist()
+
+    def _neighbours(node: int) -> Iterator[Tuple[int, int]]:
+        cell, axis = divmod(node, 2)
+        i, j = divmod(cell, w)
+        for d in (((0, 1), (0, -1)) if axis == 0 else ((1, 0), (-1, 0))):
+            ni, nj, new_heat = i, j, 0
             for step in range(1, max_steps + 1, 1):
-                new_position = tpl_add(new_position, d)
-                if not check_out_bounds(new_position, city_map.shape):
-                    new_heat += city_map[new_position]
-                    if step >= min_steps:
-                        current.put((new_heat, tpl_dist(new_position, end), new_position, d, path + [new_position]))
-    return -1, []
+                ni, nj = ni + d[0], nj + d[1]
+                if not (0 <= ni < h and 0 <= nj < w):
+                    break
+                new_heat += heat[ni * w + nj]
+                if step >= min_steps:
+                    yield (ni * w + nj) * 2 + (1 - axis), new_heat
+
+    start_cell, end_cell = start[0] * w + start[1], end[0] * w + end[1]
+    result = dijkstra(
+        sources=(start_cell * 2, start_cell * 2 + 1), neighbours=_neighbours, size=h * w * 2,
+        targets=(end_cell * 2, end_cell * 2 + 1),
+    )
+    if result.target is None:
+        return -1, []
+    return result[result.target], [divmod(node // 2, w) for node in result.path()]
@@ -12,14 +12,17 @@ import re
 from queue import PriorityQueue, Queue
 from operator import xor
 
-from shapely import Polygon, Point, LineString
 from tqdm import tqdm
 import numpy as np
 from AoC_Companion.Day import Task
 from AoC_Companion.test import TestData
 from AoC_Companion.Preprocess import Preprocessor
 
-from ..Day17 import tpl_add, tpl_mult, tpl_dist
+from ..Day16 import tpl_add
+from ..Day17 import tpl_mult, tpl_dist
+from ...lazy import lazy_import
+
+shapely = lazy_import("shapely")
 
 # noinspection DuplicatedCode
 DAY = int(os.path.basename(os.path.dirname(__file__))[3:])
@@ -104,7 +107,7 @@ def task(instructions: List[Tuple[str, int, str]], log: Callable[[AnyStr], None]
         points.append(tpl_add(t1=points[-1], t2=tpl_mult(t1=direction_tpl, mult=steps + turn_modifier)))
     if points[-1] != points[0]:
         log(f"Loop does not close")
-    poly = Polygon(((x, y) for y, x in points))
+    poly = shapely.Polygon(((x, y) for y, x in points))
 
     min_x, min_y, max_x, max_y = poly.bounds
     w, h = int(max_x - min_x), int(max_y - min_y)
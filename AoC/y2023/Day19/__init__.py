@@ -12,14 +12,14 @@ import re
 from queue import PriorityQueue, Queue
 from operator import xor
 
-from shapely import Polygon, Point, LineString
 from tqdm import tqdm
 import numpy as np
 from AoC_Companion.Day import Task
 from AoC_Companion.test import TestData
 from AoC_Companion.Preprocess import Preprocessor
 
-from ..Day17 import tpl_add, tpl_mult, tpl_dist
+from ..Day16 import tpl_add
+from ..Day17 import tpl_mult, tpl_dist
 
 # noinspection DuplicatedCode
 DAY = int(os.path.basename(os.path.dirname(__file__))[3:])
@@ -15,17 +15,19 @@ from abc import ABC, abstractmethod
 from enum import Enum
 from pprint import pformat, pprint
 
-import matplotlib.pyplot as plt
-from shapely import Polygon, Point, LineString
 from tqdm import tqdm
 import numpy as np
 from AoC_Companion.Day import Task
 from AoC_Companion.test import TestData
 from AoC_Companion.Preprocess import Preprocessor
-import networkx as nx
-from networkx.drawing.nx_pydot import graphviz_layout
 
-from ..Day17 import tpl_add, tpl_mult, tpl_dist
+from ..Day16 import tpl_add
+from ..Day17 import tpl_mult, tpl_dist
+from ...lazy import lazy_import
+
+plt = lazy_import("matplotlib.pyplot")
+nx = lazy_import("networkx")
+nx_pydot = lazy_import("networkx.drawing.nx_pydot")
 
 # noinspection DuplicatedCode
 DAY = int(os.path.basename(os.path.dirname(__file__))[3:])
@@ -154,7 +156,7 @@ def task_02(data: Tuple[Dict[str, "Module"], List, str], log: Callable[[AnyStr],
         plt.figure(figsize=(20, 20))
         g = nx.DiGraph()
         g.add_edges_from(edges)
-        layout = graphviz_layout(g, prog="dot")
+        layout = nx_pydot.graphviz_layout(g, prog="dot")
         for c, nodes in colored_nodes.items():
             nx.draw_networkx_nodes(g, layout, nodelist=nodes, node_color=c)
         nx.draw_networkx_labels(g, layout)
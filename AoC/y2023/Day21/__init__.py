@@ -15,19 +15,18 @@ from abc import ABC, abstractmethod
 from enum import Enum
 from pprint import pformat, pprint
 
-import matplotlib.pyplot as plt
-from shapely import Polygon, Point, LineString
 from tqdm import tqdm, trange
 import numpy as np
 from AoC_Companion.Day import Task
 from AoC_Companion.test import TestData
 from AoC_Companion.Preprocess import Preprocessor
 import networkx as nx
-import graphblas_algorithms as ga
-from networkx.drawing.nx_pydot import graphviz_layout
-from scipy.interpolate import KroghInterpolator, BarycentricInterpolator, lagrange
 
-from ..Day17 import tpl_add, tpl_mult, tpl_dist
+from ..Day16 import tpl_add
+from ..Day17 import tpl_mult, tpl_dist
+from ...lazy import lazy_import
+
+interpolate = lazy_import("scipy.interpolate")
 
 # noinspection DuplicatedCode
 DAY = int(os.path.basename(os.path.dirname(__file__))[3:])
@@ -163,7 +162,7 @@ def num_reachable_plots(
         x = [w//2 + i * w for i in range(3)]
         y = [sum((x[1] for x in new_reachable[:s+1][::-2])) for s in x]
         log(f"Polynomial interpolation using {', '.join(f'({x1},{y1})' for x1, y1 in zip(x, y))}")
-        poly = lagrange(list(range(len(x))), y)
+        poly = interpolate.lagrange(list(range(len(x))), y)
         return poly((step_count - w//2)/131)
 
     return sum((x[1] for x in new_reachable[:step_count+1][::-2]))
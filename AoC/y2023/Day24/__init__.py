@@ -17,20 +17,14 @@ from abc import ABC, abstractmethod
 from enum import Enum
 from pprint import pformat, pprint
 
-import matplotlib.pyplot as plt
-from shapely import Polygon, Point, LineString
 from tqdm import tqdm, trange
 import numpy as np
 from AoC_Companion.Day import Task
 from AoC_Companion.test import TestData
 from AoC_Companion.Preprocess import Preprocessor
-import networkx as nx
-import graphblas_algorithms as ga
-from networkx.drawing.nx_pydot import graphviz_layout
-from scipy.interpolate import KroghInterpolator, BarycentricInterpolator, lagrange
-from networkx.algorithms.dag import transitive_closure
 
-from ..Day17 import tpl_add, tpl_mult, tpl_dist
+from ..Day16 import tpl_add
+from ..Day17 import tpl_mult, tpl_dist
 
 # noinspection DuplicatedCode
 DAY = int(os.path.basename(os.path.dirname(__file__))[3:])
@@ -90,7 +90,7 @@ def task01(data, log: Callable[[AnyStr], None], render: bool):
     for p, d in visited:
         distinct_positions[p].add(d)
     log(f"Guard takes {len(distinct_positions)} steps before leaving the field")
-    if render is not None:
+    if render:
         from PIL import Image, ImageDraw
         pixel_size = 10
         offset = math.ceil(pixel_size * 1.5)
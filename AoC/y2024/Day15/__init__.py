@@ -88,16 +88,20 @@ def run(
         log(f"Simulating a {width}x{height} warehouse for {len(commands)} commands")
         for i, command in tqdm(enumerate(commands), total=len(commands), leave=False, desc="Executing commands",
                                unit="commands"):
+            if not renderer.active:
+                scaled_warehouse.step(vel=movements[command])
+                continue
             header = f"Command {i + 1:{len(str(len(commands)))}}: {movements_symbol.get(command, command)}"
             renderer.add_frame(frame=scaled_warehouse.draw_frame(pixel_size=12, header=header), scale=1, )
             scaled_warehouse.step(vel=movements[command])
             renderer.add_frame(frame=scaled_warehouse.draw_frame(pixel_size=12, header=header), scale=1, )
-        final_frame = scaled_warehouse.draw_frame(pixel_size=12, header=f"Final warehouse layout")
-        for _ in range(video_commands_per_second * 2 * video_final_hold_seconds):
-            renderer.add_frame(
-                frame=final_frame,
-                scale=1,
-            )
+        if renderer.active:
+            final_frame = scaled_warehouse.draw_frame(pixel_size=12, header=f"Final warehouse layout")
+            for _ in range(video_commands_per_second * 2 * video_final_hold_seconds):
+                renderer.add_frame(
+                    frame=final_frame,
+                    scale=1,
+                )
     boxes = [pos for el, pos in scaled_warehouse.get_elements().items() if el.style == MapElementStyle.BOX]
     log(f"There are {len(boxes)} boxes")
     ret = sum(min(x[0] for x in positions) * 100 + min(x[1] for x in positions) for positions in boxes)
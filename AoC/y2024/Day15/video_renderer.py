@@ -23,6 +23,10 @@ class VideoRenderer:
             except Exception as e:
                 self._log(f"Failed to create renderer for video: {e}")
 
+    @property
+    def active(self) -> bool:
+        return self._writer is not None
+
     def add_frame(self, frame, scale: int = 1):
         if self._writer is not None:
             import numpy as np
@@ -1,8 +1,7 @@
 import os.path
 import sys
-from collections import defaultdict
 from enum import Enum
-from queue import Queue
+from math import inf
 from time import perf_counter
 from typing import Callable, AnyStr, List, Tuple, Dict, Set
 
@@ -11,6 +10,7 @@ from AoC_Companion.Preprocess import Preprocessor
 
 from .image_renderer import draw_frame, DRAWELEMENTTYPE
 from ..Day15 import tpl_add, get_fraction
+from ...pathfinding import dijkstra
 
 if os.path.basename(os.path.dirname(os.path.dirname(__file__))).startswith("y"):
     _YEAR = int(os.path.basename(os.path.dirname(os.path.dirname(__file__)))[len("y"):])
@@ -59,48 +59,58 @@ def search_path(maze: Dict[Tuple[int, int], MapElementStyle], log: Callable[[Any
     log(f"The race starts at {start_pos[1]}, {start_pos[0]}")
     log(f"The race finishes at {' or '.join(f'{x[1]}, {x[0]}' for x in finishes)}")
 
-    queue: Queue[Tuple[Tuple[int, int], Tuple[int, int]]] = Queue()
-    queue.put((start_pos, start_direction))
-    cost_map: Dict[Tuple[Tuple[int, int], Tuple[int, int]], int] = defaultdict(lambda: sys.maxsize)
-    cost_map[(start_pos, start_direction)] = 0
-    path_map: Dict[Tuple[Tuple[int, int], Tuple[int, int]], Set[Tuple[Tuple[int, int], Tuple[int, int]]]] = defaultdict(
-        set)
+    # Nodes are (cell, direction) flattened into one id. The forward search gives the cheapest cost to every
+    # state, a backward search from the best finish states tells which states lie on any of the best paths.
+    # One extra row and column stay impassable so stepping over any border (even wrapping around) hits a wall
+    height, width = y_max + 2, x_max + 2
+    passable = bytearray(height * width)
+    for (i, j), style in maze.items():
+        if style not in not_passable:
+            passable[i * width + j] = 1
+    steps = [d[0] * width + d[1] for d in directions]
+    turns = [[directions.index(x) for x in get_next_direction(d)] for d in directions]
+
+    def _node(pos: Tuple[int, int], direction: Tuple[int, int]) -> int:
+        return (pos[0] * width + pos[1]) * len(directions) + directions.index(direction)
+
+    def _forward(node: int):
+        cell, d = divmod(node, len(directions))
+        if passable[cell + steps[d]]:
+            yield (cell + steps[d]) * len(directions) + d, 1
+        for t in turns[d]:
+            yield cell * len(directions) + t, 1000
+
+    def _backward(node: int):
+        cell, d = divmod(node, len(directions))
+        if passable[cell - steps[d]]:
+            yield (cell - steps[d]) * len(directions) + d, 1
+        for t in turns[d]:
+            yield cell * len(directions) + t, 1000
+
+    size = height * width * len(directions)
     t1 = perf_counter()
-    while not queue.empty():
-        cur_position, cur_direction = queue.get()
-        next_position = tpl_add(cur_position, cur_direction)
-        if next_position in maze and maze[next_position] not in not_passable:
-            if cost_map[(next_position, cur_direction)] == cost_map[(cur_position, cur_direction)] + 1:
-                path_map[(next_position, cur_direction)].add((cur_position, cur_direction))
-            elif cost_map[(next_position, cur_direction)] > cost_map[(cur_position, cur_direction)] + 1:
-                cost_map[(next_position, cur_direction)] = cost_map[(cur_position, cur_direction)] + 1
-                path_map[(next_position, cur_direction)] = {(cur_position, cur_direction)}
-                queue.put((next_position, cur_direction))
-        for next_direction in get_next_direction(cur_direction):
-            if cost_map[(cur_position, next_direction)] == cost_map[(cur_position, cur_direction)] + 1000:
-                path_map[(cur_position, next_direction)].add((cur_position, cur_direction))
-            elif cost_map[(cur_position, next_direction)] > cost_map[(cur_position, cur_direction)] + 1000:
-                cost_map[(cur_position, next_direction)] = cost_map[(cur_position, cur_direction)] + 1000
-                path_map[(cur_position, next_direction)] = {(cur_position, cur_direction)}
-                queue.put((cur_position, next_direction))
+    forward = dijkstra(sources=_node(start_pos, start_direction), neighbours=_forward, size=size)
     t2 = perf_counter()
     log(f"Search for best path took {t2 - t1:.6}s")
-    best_finish = sorted(finishes, key=lambda x: min(cost_map[(x, d)] for d in directions))[0]
-    best_direction = sorted(((p, d) for p, d in cost_map.keys() if p == best_finish), key=lambda x: cost_map[x])[0][1]
+    best_finish = sorted(finishes, key=lambda x: min(forward[_node(x, d)] for d in directions))[0]
+    best_cost = min(forward[_node(best_finish, d)] for d in directions)
+    if best_cost == inf:
+        log("There is no way to get to the finish")
+        return sys.maxsize, {best_finish}
 
-    finish_tiles = set()
-    queue_back: Queue[Tuple[Tuple[int, int], Tuple[int, int]]] = Queue()
-    queue_back.put((best_finish, best_direction))
     t1 = perf_counter()
-    while not queue_back.empty():
-        cur_position, cur_direction = queue_back.get()
-        finish_tiles.add(cur_position)
-        for orig_position, orig_direction in path_map[(cur_position, cur_direction)]:
-            queue_back.put((orig_position, orig_direction))
+    backward = dijkstra(
+        sources=[_node(best_finish, d) for d in directions if forward[_node(best_finish, d)] == best_cost],
+        neighbours=_backward, size=size,
+    )
+    finish_tiles = set(
+        divmod(node // len(directions), width) for node in range(size)
+        if forward[node] + backward[node] == best_cost
+    )
     t2 = perf_counter()
     log(f"Backtracking of all tiles adjacent to best paths took {t2 - t1:.6}s")
 
-    return min(cost_map[(best_finish, d)] for d in directions), finish_tiles
+    return best_cost, finish_tiles
 
 
 @Preprocessor(year=2024, day=_DAY)
@@ -120,7 +130,6 @@ def task01(data: Dict[Tuple[int, int], MapElementStyle], log: Callable[[AnyStr],
     if render:
         x_min, y_min = min(x[1] for x in data.keys()), min(x[0] for x in data.keys())
         x_max, y_max = max(x[1] for x in data.keys()), max(x[0] for x in data.keys())
-        from .image_renderer import draw_frame
         draw_method = create_draw_method(maze=data, good_tiles=good_tiles)
         file_name = os.path.join(os.path.dirname(__file__), "maze_solution.png")
         draw_frame(
@@ -0,0 +1,70 @@
+from typing import Iterator, Tuple
+
+import numpy as np
+
+_PRUNE_MASK = np.uint32(16777216 - 1)
+_CHANGE_BASE = 19
+
+
+def advance(secret_numbers: np.ndarray) -> np.ndarray:
+    """
+    Moves every secret number one step forward in place. Multiplying/dividing by powers of two and pruning with
+    2^24 are just shifts and masks, so the whole step stays inside uint32
+    """
+    secret_numbers ^= (secret_numbers << np.uint32(6)) & _PRUNE_MASK
+    secret_numbers ^= secret_numbers >> np.uint32(5)
+    secret_numbers ^= (secret_numbers << np.uint32(11)) & _PRUNE_MASK
+    return secret_numbers
+
+
+def secret_number_sequences(secret_numbers: np.ndarray, amount: int) -> np.ndarray:
+    ret = np.empty((secret_numbers.shape[0], amount + 1), dtype=np.uint32)
+    ret[:, 0] = secret_numbers
+    current = ret[:, 0].copy()
+    for i in range(1, amount + 1):
+        ret[:, i] = advance(current)
+    return ret
+
+
+def predict(secret_numbers: np.ndarray, amount: int) -> np.ndarray:
+    current = np.array(secret_numbers, dtype=np.uint32)
+    for _ in range(amount):
+        advance(current)
+    return current
+
+
+def decode_changes(code: int, change_sequence_length: int) -> Tuple[int, ...]:
+    ret = []
+    for _ in range(change_sequence_length):
+        code, c = divmod(code, _CHANGE_BASE)
+        ret.append(c - _CHANGE_BASE // 2)
+    return tuple(reversed(ret))
+
+
+def price_table(
+        secret_numbers: np.ndarray, amount: int, change_sequence_length: int, chunk_size: int = 1024
+) -> np.ndarray:
+    """
+    Total price every change sequence would earn, indexed by its base-19 code.
+    Only the first occurrence of a sequence counts per buyer. Buyers are processed in chunks so memory is
+    bounded by chunk_size * amount no matter how many buyers there are
+    """
+    table_size = _CHANGE_BASE ** change_sequence_length
+    ret = np.zeros(table_size, dtype=np.int64)
+    for chunk in _chunks(np.asarray(secret_numbers, dtype=np.uint32), chunk_size):
+        prices = (secret_number_sequences(chunk, amount=amount) % 10).astype(np.int64)
+        changes = np.diff(prices, axis=1) + _CHANGE_BASE // 2
+        codes = np.zeros((chunk.shape[0], changes.shape[1] - change_sequence_length + 1), dtype=np.int64)
+        for k in range(change_sequence_length):
+            codes = codes * _CHANGE_BASE + changes[:, k:k + codes.shape[1]]
+        keys = (np.arange(chunk.shape[0], dtype=np.int64)[:, None] * table_size + codes).ravel()
+        _, first = np.unique(keys, return_index=True)
+        ret += np.bincount(
+            codes.ravel()[first], weights=prices[:, change_sequence_length:].ravel()[first], minlength=table_size
+        ).astype(np.int64)
+    return ret
+
+
+def _chunks(values: np.ndarray, chunk_size: int) -> Iterator[np.ndarray]:
+    for i in range(0, values.shape[0], chunk_size):
+        yield values[i:i + chunk_size]
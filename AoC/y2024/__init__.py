@@ -1,12 +1,6 @@
-import os
-from importlib import import_module
-
 from AoC_Companion.Preprocess import Preprocessor
 
-for k in os.listdir(os.path.dirname(__file__)):
-    if not os.path.isdir(os.path.join(os.path.dirname(__file__), k)) or k.startswith("_"):
-        continue
-    import_module(f".{k}", __name__)
+# Days are only imported once they are selected, see AoC.manifest
 
 
 @Preprocessor(year=2024)
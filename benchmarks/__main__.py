@@ -0,0 +1,42 @@
+import argparse
+import sys
+from typing import List, Optional
+
+from benchmarks import suite
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark registered tasks on stored inputs")
+    parser.add_argument("--years", type=int, nargs="*", default=[])
+    parser.add_argument("--days", type=int, nargs="*", default=[])
+    parser.add_argument("--tasks", type=int, nargs="*", default=[])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--max-time", type=float, default=None, help="Stop repeating a task after this many seconds")
+    parser.add_argument("--inputs", default=None, help="Input directory, see AoC.inputs")
+    parser.add_argument("--history", default=suite.HISTORY_PATH, help="CSV file the results are appended to")
+    parser.add_argument("--no-history", action="store_true")
+    parser.add_argument("--baseline", default=suite.BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="Flag tasks that got slower than the baseline")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Allowed slowdown, 0.1 = 10%%")
+    args = parser.parse_args(argv)
+
+    results = suite.benchmark(
+        years=args.years, days=args.days, tasks=args.tasks, runs=args.runs, warmup=args.warmup,
+        max_time=args.max_time, input_dir=args.inputs,
+    )
+    failures = [r for r in results if r.error is not None]
+    if not args.no_history:
+        suite.append_history(results, path=args.history)
+    if args.save_baseline:
+        suite.save_baseline(results, path=args.baseline)
+    if args.compare:
+        regressions = suite.compare(results, suite.load_baseline(args.baseline), threshold=args.threshold)
+        print(suite.format_regressions(regressions, threshold=args.threshold))
+        return 1 if len(regressions) > 0 or len(failures) > 0 else 0
+    return 1 if len(failures) > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
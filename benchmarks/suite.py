@@ -0,0 +1,202 @@
+import csv
+import json
+import math
+import os
+import statistics
+import subprocess
+import time
+from copy import deepcopy
+from time import perf_counter
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from AoC import inputs, manifest, registry
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+HISTORY_PATH = os.path.join(BENCHMARK_DIR, "history.csv")
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+# extra_config switches that only produce images, videos or plots
+VISUAL_KEYS = ("render", "draw", "graphs", "animate", "create_image", "create_visual", "create_summary",
+               "_visualization")
+
+
+class BenchmarkResult(NamedTuple):
+    year: int
+    day: int
+    task: int
+    runs: int
+    median: float
+    p95: float
+    mean: float
+    stddev: float
+    minimum: float
+    maximum: float
+    error: Optional[str] = None
+
+
+class Regression(NamedTuple):
+    year: int
+    day: int
+    task: int
+    baseline: float
+    current: float
+
+    @property
+    def slowdown(self) -> float:
+        return self.current / self.baseline - 1 if self.baseline > 0 else math.inf
+
+
+def _percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[max(0, math.ceil(q * len(values)) - 1)]
+
+
+def summarize(year: int, day: int, task: int, timings: List[float]) -> BenchmarkResult:
+    return BenchmarkResult(
+        year=year, day=day, task=task, runs=len(timings), median=statistics.median(timings),
+        p95=_percentile(timings, 0.95), mean=statistics.fmean(timings),
+        stddev=statistics.stdev(timings) if len(timings) > 1 else 0.0, minimum=min(timings), maximum=max(timings),
+    )
+
+
+def failed(year: int, day: int, task: int, error: BaseException) -> BenchmarkResult:
+    return BenchmarkResult(
+        year=year, day=day, task=task, runs=0, median=math.nan, p95=math.nan, mean=math.nan, stddev=math.nan,
+        minimum=math.nan, maximum=math.nan, error=f"{error.__class__.__name__}: {error}",
+    )
+
+
+def _no_visuals(extra_config: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: False for k in extra_config if k in VISUAL_KEYS}
+
+
+def benchmark_day(
+        year: int, day: int, tasks: Iterable[int] = (), runs: int = 5, warmup: int = 1,
+        max_time: Optional[float] = None, input_dir: Optional[str] = None,
+) -> List[BenchmarkResult]:
+    """
+    Times every selected task of a day. The day is preprocessed once, every run gets its own copy of that data
+    so tasks that consume their input behave the same each time. Copying happens outside the timed region.
+    Once max_time seconds were spent on a task no further runs are started. A task that raises is reported as
+    failed and the others still run
+    """
+    manifest.import_day(year, day)
+    tasks = set(tasks)
+    entries = {k: v for k, v in registry.tasks(year, day).items() if len(tasks) <= 0 or k in tasks}
+    try:
+        data = registry.preprocess(year=year, day=day, data=inputs.load_input(year=year, day=day, path=input_dir))
+    except Exception as e:
+        return [failed(year=year, day=day, task=task, error=e) for task in entries]
+    ret = []
+    for task, entry in entries.items():
+        overrides = _no_visuals(entry.extra_config)
+        timings: List[float] = []
+        spent = 0.0
+        try:
+            for i in range(warmup + runs):
+                run_data = deepcopy(data)
+                t1 = perf_counter()
+                registry.run_task(year=year, day=day, task=task, data=run_data, log=lambda *_: None, **overrides)
+                duration = perf_counter() - t1
+                spent += duration
+                if i >= warmup:
+                    timings.append(duration)
+                if max_time is not None and spent >= max_time and len(timings) > 0:
+                    break
+        except Exception as e:
+            ret.append(failed(year=year, day=day, task=task, error=e))
+            continue
+        ret.append(summarize(year=year, day=day, task=task, timings=timings))
+    return ret
+
+
+def benchmark(
+        years: Iterable[int] = (), days: Iterable[int] = (), tasks: Iterable[int] = (), runs: int = 5,
+        warmup: int = 1, max_time: Optional[float] = None, input_dir: Optional[str] = None,
+        log=print,
+) -> List[BenchmarkResult]:
+    years, days = list(years) or manifest.available_years(), set(days)
+    ret = []
+    for year in years:
+        for day in manifest.discover().get(year, {}):
+            if len(days) > 0 and day not in days:
+                continue
+            if not inputs.has_input(year=year, day=day, path=input_dir):
+                log(f"{year} Day {day:02d}: no stored input at {inputs.input_path(year, day, input_dir)}")
+                continue
+            for result in benchmark_day(
+                    year=year, day=day, tasks=tasks, runs=runs, warmup=warmup, max_time=max_time, input_dir=input_dir
+            ):
+                log(format_result(result))
+                ret.append(result)
+    return ret
+
+
+def format_result(r: BenchmarkResult) -> str:
+    if r.error is not None:
+        return f"{r.year} Day {r.day:02d} Task {r.task}: failed with {r.error}"
+    return (f"{r.year} Day {r.day:02d} Task {r.task}: median {r.median:.6f}s  p95 {r.p95:.6f}s  "
+            f"stddev {r.stddev:.6f}s  ({r.runs} runs)")
+
+
+def _revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCHMARK_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def append_history(results: List[BenchmarkResult], path: str = HISTORY_PATH):
+    new_file = not os.path.isfile(path)
+    timestamp, revision = time.strftime("%Y-%m-%dT%H:%M:%S"), _revision()
+    with open(path, "a", encoding="utf-8", newline="") as f_out:
+        writer = csv.writer(f_out)
+        if new_file:
+            writer.writerow(("timestamp", "revision") + BenchmarkResult._fields)
+        for r in results:
+            writer.writerow((timestamp, revision) + tuple(r))
+
+
+def _key(year: int, day: int, task: int) -> str:
+    return f"{year}/{day}/{task}"
+
+
+def save_baseline(results: List[BenchmarkResult], path: str = BASELINE_PATH):
+    baseline = load_baseline(path) if os.path.isfile(path) else {}
+    baseline.update({_key(r.year, r.day, r.task): r._asdict() for r in results if r.error is None})
+    with open(path, "w", encoding="utf-8") as f_out:
+        json.dump(dict(sorted(baseline.items())), f_out, indent=2)
+
+
+def load_baseline(path: str = BASELINE_PATH) -> Dict[str, Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f_in:
+        return json.load(f_in)
+
+
+def compare(
+        results: List[BenchmarkResult], baseline: Dict[str, Dict[str, Any]], threshold: float = 0.1
+) -> List[Regression]:
+    """
+    Tasks whose median got slower than the baseline median by more than threshold (0.1 = 10%)
+    """
+    ret = []
+    for r in results:
+        base: Optional[Dict[str, Any]] = baseline.get(_key(r.year, r.day, r.task))
+        if base is None or r.error is not None:
+            continue
+        regression = Regression(year=r.year, day=r.day, task=r.task, baseline=base["median"], current=r.median)
+        if regression.slowdown > threshold:
+            ret.append(regression)
+    return ret
+
+
+def format_regressions(regressions: List[Regression], threshold: float) -> str:
+    if len(regressions) <= 0:
+        return f"No task got more than {threshold:.0%} slower than the baseline"
+    ret = [f"{len(regressions)} tasks got more than {threshold:.0%} slower than the baseline:"]
+    for r in regressions:
+        ret.append(f"  {r.year} Day {r.day:02d} Task {r.task}: {r.baseline:.6f}s -> {r.current:.6f}s "
+                   f"(+{r.slowdown:.0%})")
+    return "\n".join(ret)
@@ -0,0 +1,70 @@
+import math
+
+import pytest
+
+pytest.importorskip("AoC_Companion")
+
+from AoC import inputs, manifest, registry
+from benchmarks import suite
+
+
+def test_percentile():
+    values = [5.0, 1.0, 4.0, 2.0, 3.0]
+    assert suite._percentile(values, 0.5) == 3.0
+    assert suite._percentile(values, 0.95) == 5.0
+    assert suite._percentile(values, 0.0) == 1.0
+    assert suite._percentile([7.0], 0.95) == 7.0
+
+
+def test_summarize():
+    r = suite.summarize(year=2021, day=1, task=2, timings=[3.0, 1.0, 2.0, 6.0])
+    assert (r.year, r.day, r.task, r.runs) == (2021, 1, 2, 4)
+    assert r.median == 2.5
+    assert r.p95 == 6.0
+    assert r.mean == 3.0
+    assert r.stddev == pytest.approx(math.sqrt(14 / 3))
+    assert (r.minimum, r.maximum) == (1.0, 6.0)
+    assert r.error is None
+    assert suite.summarize(year=2021, day=1, task=2, timings=[1.5]).stddev == 0.0
+
+
+def test_compare_with_baseline(tmp_path):
+    path = str(tmp_path / "baseline.json")
+    suite.save_baseline([
+        suite.summarize(year=2021, day=1, task=1, timings=[1.0]),
+        suite.summarize(year=2021, day=1, task=2, timings=[1.0]),
+        suite.summarize(year=2021, day=2, task=1, timings=[1.0]),
+    ], path=path)
+    results = [
+        suite.summarize(year=2021, day=1, task=1, timings=[1.05]),
+        suite.summarize(year=2021, day=1, task=2, timings=[1.5]),
+        suite.failed(year=2021, day=2, task=1, error=ValueError("broken")),
+        suite.summarize(year=2021, day=3, task=1, timings=[9.0]),
+    ]
+    regressions = suite.compare(results, suite.load_baseline(path), threshold=0.1)
+    assert regressions == [suite.Regression(year=2021, day=1, task=2, baseline=1.0, current=1.5)]
+    assert regressions[0].slowdown == pytest.approx(0.5)
+
+    # Failed tasks never replace the stored timings
+    suite.save_baseline(results, path=path)
+    baseline = suite.load_baseline(path)
+    assert baseline["2021/2/1"]["median"] == 1.0
+    assert baseline["2021/3/1"]["median"] == 9.0
+
+
+def test_failing_task_does_not_stop_the_day(monkeypatch):
+    def run_task(year, day, task, data, log, **_):
+        if task == 1:
+            raise ValueError("broken")
+        return data
+
+    monkeypatch.setattr(manifest, "import_day", lambda year, day: None)
+    monkeypatch.setattr(inputs, "load_input", lambda **_: "")
+    monkeypatch.setattr(registry, "tasks", lambda year, day: {
+        t: registry.TaskEntry(year=year, day=day, task=t, func=None, extra_config={}) for t in (1, 2)
+    })
+    monkeypatch.setattr(registry, "run_task", run_task)
+    first, second = suite.benchmark_day(year=2000, day=1, runs=2, warmup=0)
+    assert (first.task, first.runs, first.error) == (1, 0, "ValueError: broken")
+    assert "failed with ValueError: broken" in suite.format_result(first)
+    assert (second.task, second.runs, second.error) == (2, 2, None)
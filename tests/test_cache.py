@@ -0,0 +1,57 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("AoC_Companion")
+
+from AoC import cache
+
+
+def test_config_edit_misses_cache(tmp_path, monkeypatch):
+    day_dir = tmp_path / "Day06"
+    day_dir.mkdir()
+    (day_dir / "__init__.py").write_text("VALUE = 1\n")
+    config = day_dir / "config.json"
+    config.write_text(json.dumps({"days": {"1": 80}}))
+    monkeypatch.setattr(cache, "source_files", lambda year, day: frozenset({str(day_dir / "__init__.py")}))
+    cache.config_files.cache_clear()
+    cache.source_hash.cache_clear()
+
+    result_cache = cache.ResultCache(directory=str(tmp_path / "cache"))
+    k = cache.key("task", year=2021, day=6, raw="3,4,3,1,2", task=1)
+    result_cache.put(k, 5934)
+    assert result_cache.get(cache.key("task", year=2021, day=6, raw="3,4,3,1,2", task=1)) == 5934
+
+    config.write_text(json.dumps({"days": {"1": 18}}))
+    # The hash is computed once per process, the edit is seen by the next run
+    cache.source_hash.cache_clear()
+    assert result_cache.get(cache.key("task", year=2021, day=6, raw="3,4,3,1,2", task=1)) is cache.MISSING
+    cache.config_files.cache_clear()
+    cache.source_hash.cache_clear()
+
+
+def test_put_evicts_only_beyond_max_bytes(tmp_path, monkeypatch):
+    result_cache = cache.ResultCache(directory=str(tmp_path), max_bytes=1000)
+    evictions = []
+    evict = result_cache.evict
+    monkeypatch.setattr(result_cache, "evict", lambda: evictions.append(1) or evict())
+    for i in range(4):
+        assert result_cache.put(f"{i:02d}key", b"x" * 200)
+    assert evictions == []
+    assert result_cache.put("04key", b"x" * 200)
+    assert len(evictions) == 1
+    assert result_cache.size() <= 1000
+    assert result_cache.get("00key") is cache.MISSING
+    assert result_cache.get("04key") == b"x" * 200
+
+
+def test_failed_put_leaves_no_temp_file(tmp_path, monkeypatch):
+    result_cache = cache.ResultCache(directory=str(tmp_path))
+
+    def replace(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(cache.os, "replace", replace)
+    assert not result_cache.put("00key", 1)
+    assert [f for _, _, files in os.walk(tmp_path) for f in files] == []
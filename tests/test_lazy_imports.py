@@ -0,0 +1,78 @@
+import subprocess
+import sys
+import os
+
+import pytest
+
+pytest.importorskip("AoC_Companion")
+
+from AoC import manifest
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_RENDER_ONLY = ("matplotlib", "PIL")
+_CHECK = """
+import sys
+from AoC import manifest
+manifest.import_day({year}, {day})
+print(",".join(m for m in {modules!r} if m in sys.modules))
+"""
+
+
+@pytest.mark.parametrize(
+    "year,day", [(year, day) for year, days in manifest.discover().items() for day in days]
+)
+def test_day_import_skips_render_libraries(year: int, day: int):
+    # Every day is imported in a fresh interpreter, otherwise one day would hide the imports of another
+    code = _CHECK.format(year=year, day=day, modules=_RENDER_ONLY)
+    result = subprocess.run([sys.executable, "-c", code], cwd=_ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "", f"y{year} day {day} imports {result.stdout.strip()} without rendering"
+
+
+_VISUAL_FLAGS = ("render", "draw", "graphs", "create_image", "create_visual", "create_summary", "_visualization",
+                 "animate")
+_RUN = """
+import sys
+for module in {modules!r}:
+    sys.modules[module] = None
+from AoC import inputs, manifest, registry
+manifest.import_day({year}, {day})
+config = {{k: False for k in registry.get_task({year}, {day}, {task}).extra_config if k in {flags!r}}}
+config.update({config!r})
+data = registry.preprocess({year}, {day}, inputs.load_input({year}, {day}, path={examples!r}))
+print(registry.run_task({year}, {day}, {task}, data, log=lambda *_: None, **config))
+"""
+
+
+@pytest.mark.parametrize("year,day,task,config,expected", [
+    (2021, 6, 1, {}, "5934"),
+    (2021, 9, 2, {}, "1134"),
+    (2021, 16, 2, {}, "3"),
+    (2021, 19, 2, {}, "1357"),
+    (2021, 20, 1, {}, "0"),
+    (2022, 8, 1, {}, "21"),
+    (2022, 9, 1, {}, "13"),
+    (2022, 12, 1, {}, "31"),
+    (2022, 14, 1, {}, "24"),
+    (2022, 15, 2, {"x_range": (0, 20), "y_range": (0, 20)}, "56000011"),
+    (2022, 22, 1, {}, "6032"),
+    (2023, 10, 2, {}, "4"),
+    (2023, 14, 1, {}, "136"),
+    (2023, 16, 1, {}, "46"),
+    (2023, 17, 1, {}, "102"),
+    (2023, 18, 1, {}, "62"),
+    (2023, 20, 2, {}, "4"),
+    (2023, 23, 1, {}, "94"),
+    (2024, 6, 1, {}, "41"),
+    (2024, 14, 2, {"bounds": ((0, 11), (0, 7))}, "1"),
+    (2024, 15, 1, {}, "2028"),
+    (2024, 16, 1, {}, "7036"),
+    (2024, 18, 2, {}, "6,1"),
+])
+def test_task_runs_without_render_libraries(year: int, day: int, task: int, config: dict, expected: str):
+    # Rendering libraries are blocked, so switching every visual flag off has to be enough to get the result
+    code = _RUN.format(year=year, day=day, task=task, config=config, modules=_RENDER_ONLY, flags=_VISUAL_FLAGS,
+                       examples=os.path.join(_ROOT, "tests", "examples"))
+    result = subprocess.run([sys.executable, "-c", code], cwd=_ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == expected
@@ -0,0 +1,19 @@
+import pytest
+
+pytest.importorskip("AoC_Companion")
+
+from AoC.y2021.Day24.monad import MONAD
+
+# z = (w1 - 5) + (w2 - 5), y gets negative so a z above the divisor product can still get back to 0
+_ADD_NEGATIVE = ["inp w", "mul y 0", "add y w", "add y -5", "add z y"] * 2
+# z = w1 * (w2 - 1), y can be 0 so multiplying can bring z back to 0
+_MUL_ZERO = ["inp w", "add z w", "inp w", "mul y 0", "add y w", "add y -1", "mul z y"]
+
+
+@pytest.mark.parametrize("program,smallest,biggest", [(_ADD_NEGATIVE, 19, 91), (_MUL_ZERO, 11, 91)])
+def test_z_limits_need_non_negative_y(program, smallest, biggest):
+    monad = MONAD(program, number_len=2)
+    assert monad._z_limits(monad._instructions.input_blocks()) is None
+    assert monad.force_smallest_number() == smallest
+    assert monad.force_biggest_number() == biggest
+    assert monad.find_valid_number_range() == (smallest, biggest)
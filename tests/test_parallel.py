@@ -0,0 +1,39 @@
+import multiprocessing
+import time
+
+import pytest
+
+pytest.importorskip("AoC_Companion")
+
+from AoC import inputs, manifest, parallel, registry
+
+pytestmark = pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork", reason="patched functions only reach forked workers"
+)
+
+
+def _run_task(year: int, day: int, task: int, data, log):
+    if task == 1:
+        time.sleep(60)
+    if task == 2:
+        # One long call into C code, no python bytecode runs until it returns
+        return sum(range(10 ** 14))
+    return data * 2
+
+
+@pytest.fixture
+def fake_day(monkeypatch):
+    monkeypatch.setattr(parallel, "select_units", lambda **_: {(2000, 1): [1, 2, 3]})
+    monkeypatch.setattr(inputs, "has_input", lambda **_: True)
+    monkeypatch.setattr(inputs, "load_input", lambda **_: "21")
+    monkeypatch.setattr(manifest, "import_day", lambda year, day: None)
+    monkeypatch.setattr(registry, "preprocess", lambda year, day, data: int(data))
+    monkeypatch.setattr(registry, "run_task", _run_task)
+
+
+def test_timeout_stops_sleeping_and_c_bound_tasks(fake_day):
+    t1 = time.perf_counter()
+    results = parallel.run_parallel(workers=3, timeout=1)
+    assert time.perf_counter() - t1 < 20
+    assert [(r.task, r.status) for r in results] == [(1, "timeout"), (2, "timeout"), (3, "ok")]
+    assert results[2].result == 42